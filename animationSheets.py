@@ -0,0 +1,132 @@
+from PIL import Image
+import json
+import os
+import re
+import sys
+
+"""
+    Description: Build step that packs each type's move animation frames
+                 (frames/<type>frame<N>.gif) side by side into one sheet per
+                 type, plus a JSON index of where every frame is in its
+                 sheet. The game loads the sheets once at startup
+                 (resizeImageZelle.AnimationSheets) and plays animations by
+                 picking frames out of them, so playing a move never touches
+                 the disk.
+
+    Usage: python animationSheets.py (the game also rebuilds the sheets on
+           start if a frame is newer than them)
+"""
+
+FRAME_DIR = "frames"
+SHEET_DIR = os.path.join(FRAME_DIR, "sheets")
+ANIMATION_INDEX = os.path.join(SHEET_DIR, "index.json")
+
+FRAME_PATTERN = re.compile(r"^([a-z]+)frame(\d+)\.gif$")
+
+
+def findFrameFiles(frameDir=FRAME_DIR):
+    """
+        Description: Lists every animation's frames with one directory scan
+        Parameters: frameDir- folder with the frame GIFs (str)
+        Return Val: animation name (a type, e.g. "fire") to its frame files in
+                    order (dict of list of str); like the old findFrames, a
+                    type's frames stop at the first missing number
+    """
+    numbered = {}
+    if os.path.isdir(frameDir):
+        for entry in os.scandir(frameDir):
+            match = FRAME_PATTERN.match(entry.name)
+            if match:
+                numbered.setdefault(match.group(1), {})[
+                    int(match.group(2))] = entry.path
+
+    frameFiles = {}
+    for animation, frames in numbered.items():
+        paths = []
+        number = 1
+        while number in frames:
+            paths.append(frames[number])
+            number += 1
+        if paths:
+            frameFiles[animation] = paths
+    return frameFiles
+
+
+def buildSheets(frameDir=FRAME_DIR, sheetDir=SHEET_DIR,
+                indexFile=ANIMATION_INDEX):
+    """
+        Description: Packs each animation's frames into a sheet
+        Parameters: frameDir- folder with the frame GIFs (str),
+                    sheetDir- folder to write the sheets to (str),
+                    indexFile- the index to write (str)
+        Return Val: the index (dict of animation name to {"sheet": file name
+                    of its sheet, "frames": [x, y, width, height] of each
+                    frame in order})
+    """
+    os.makedirs(sheetDir, exist_ok=True)
+    index = {}
+    for animation, paths in sorted(findFrameFiles(frameDir).items()):
+        frames = []
+        for path in paths:
+            with Image.open(path) as frame:
+                frames.append(frame.convert("RGBA"))
+        sheet = Image.new("RGBA", (sum(x.width for x in frames),
+                                   max(x.height for x in frames)))
+        rects = []
+        x = 0
+        for frame in frames:
+            sheet.paste(frame, (x, 0))
+            rects.append([x, 0, frame.width, frame.height])
+            x += frame.width
+        sheetFile = animation + ".png"
+        sheet.save(os.path.join(sheetDir, sheetFile))
+        index[animation] = {"sheet": sheetFile, "frames": rects}
+
+    with open(indexFile, "w") as outfile:
+        json.dump(index, outfile, indent=1)
+    return index
+
+
+def readAnimationIndex(frameDir=FRAME_DIR, sheetDir=SHEET_DIR,
+                       indexFile=ANIMATION_INDEX):
+    """
+        Description: Reads the sheet index, rebuilding the sheets first if
+                     they're missing or a frame was added or changed since
+                     they were built
+        Parameters: same as buildSheets
+        Return Val: the index (dict, see buildSheets); empty if there are no
+                    frames
+    """
+    if not os.path.isdir(frameDir):
+        return {}
+    try:
+        with open(indexFile) as infile:
+            index = json.load(infile)
+        builtAt = os.path.getmtime(indexFile)
+    except (OSError, ValueError):
+        return buildSheets(frameDir, sheetDir, indexFile)
+
+    frameFiles = findFrameFiles(frameDir)
+    counts = {animation: len(x["frames"]) for animation, x in index.items()}
+    upToDate = counts == {animation: len(paths)
+                          for animation, paths in frameFiles.items()} and \
+        all(os.path.getmtime(path) <= builtAt
+            for paths in frameFiles.values() for path in paths)
+    if not upToDate:
+        return buildSheets(frameDir, sheetDir, indexFile)
+    return index
+
+
+def main():
+    frameDir = sys.argv[1] if len(sys.argv) > 1 else FRAME_DIR
+    if not os.path.isdir(frameDir):
+        print("No frames folder at", frameDir)
+        return
+    index = buildSheets(frameDir, os.path.join(frameDir, "sheets"),
+                        os.path.join(frameDir, "sheets", "index.json"))
+    for animation, sheet in sorted(index.items()):
+        print("%s: %d frames" % (animation, len(sheet["frames"])))
+
+
+if __name__ == '__main__':
+    main()
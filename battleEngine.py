@@ -0,0 +1,166 @@
+from damageCalc import localDamageRange, rollDamage
+import random
+
+"""
+    Description: The rules of a 1-1 battle, with no drawing or Tk. A Battle
+                 keeps both Pokemon's HP, decides who moves first each turn
+                 by Speed, applies damage and works out the winner. The GUI
+                 in pokemonPlay draws what a Battle reports, and battles can
+                 also be played out with no window at all (playBattle).
+"""
+
+PLAYER = 0
+COMPUTER = 1
+
+MAX_HP = 100  # HP is kept as a percentage, like the damage calculator's range
+
+
+def getMoves(pokemon, moveRecords, rng=random):
+    """
+    Description: Gets a set of four different moves from a Pokemon's movepool
+    Parameters: pokemon- the Pokemon (PokemonRecord object),
+                moveRecords- every move, in ID order (list of MoveRecord),
+                rng- random number generator to use (random.Random)
+    Return Val: a set of four moves, or the whole movepool if it has fewer
+                than four (list of MoveRecord objects)
+    """
+    # movepools are compiled to unique move IDs, so sampling without
+    # replacement can't pick a move twice
+    moveIds = rng.sample(pokemon.moveIds, min(4, len(pokemon.moveIds)))
+    return [moveRecords[moveId] for moveId in moveIds]
+
+
+class Battler:
+
+    """One side of a battle: a Pokemon, its four moves and its HP"""
+
+    __slots__ = ("pokemon", "name", "moves", "speed", "hp")
+
+    def __init__(self, pokemon, moves):
+        self.pokemon = pokemon
+        self.name = pokemon.name
+        self.moves = moves
+        self.speed = pokemon.speed
+        self.hp = MAX_HP
+
+    def __repr__(self):
+        return "Battler({}, {})".format(self.name, self.hp)
+
+    def isFainted(self):
+        return self.hp <= 0
+
+
+class Battle:
+
+    """A battle between the player's Pokemon (PLAYER) and the computer's
+    Pokemon (COMPUTER)"""
+
+    def __init__(self, playersPokemon, computersPokemon, moveRecords,
+                 playersMoves=None, computersMoves=None, calculateDamages=None,
+                 rng=None):
+        """
+            Parameters: playersPokemon, computersPokemon- each side's Pokemon
+                        (PokemonRecord objects),
+                        moveRecords- every move, in ID order (list of
+                        MoveRecord objects),
+                        playersMoves, computersMoves- each side's four moves,
+                        picked with getMoves if not given (list of
+                        MoveRecord objects),
+                        calculateDamages- function taking a list of
+                        (attackingPokemon, defendingPokemon, move) and
+                        returning each move's damage (list of int); defaults
+                        to damageCalc's local calculator,
+                        rng- random number generator for move choices and
+                        damage rolls (random.Random)
+        """
+        self.rng = rng or random.Random()
+        if playersMoves is None:
+            playersMoves = getMoves(playersPokemon, moveRecords, self.rng)
+        if computersMoves is None:
+            computersMoves = getMoves(computersPokemon, moveRecords, self.rng)
+        self.battlers = [Battler(playersPokemon, playersMoves),
+                         Battler(computersPokemon, computersMoves)]
+        self.calculateDamages = calculateDamages or self._localDamages
+        self.turns = 0
+        self.winner = None
+
+    def _localDamages(self, triples):
+        return [rollDamage(localDamageRange(*triple), self.rng)
+                for triple in triples]
+
+    def turnOrder(self):
+        """
+            Description: Works out who moves first this turn
+            Parameters: None
+            Return Val: battler indexes, fastest first (list of int); the
+                        player goes first on a Speed tie
+        """
+        player, computer = self.battlers
+        if computer.speed > player.speed:
+            return [COMPUTER, PLAYER]
+        return [PLAYER, COMPUTER]
+
+    def chooseMove(self, index):
+        """
+            Description: Picks a random move for one side (the computer's AI)
+            Parameters: index- the battler to pick for (int)
+            Return Val: the move (MoveRecord object)
+        """
+        return self.rng.choice(self.battlers[index].moves)
+
+    def playTurn(self, playersMove, computersMove=None):
+        """
+            Description: Plays one turn. Both moves' damage is calculated in
+                         one call to calculateDamages, then applied in Speed
+                         order until one side faints.
+            Parameters: playersMove- the move the player picked
+                        (MoveRecord object),
+                        computersMove- the computer's move, picked with
+                        chooseMove if not given (MoveRecord object)
+            Return Val: the attacks that happened, in order (list of dict
+                        with "attacker", "defender", "move", "damage" and
+                        "hpBefore" (the defender's HP before the attack))
+        """
+        if self.winner is not None:
+            return []
+        if computersMove is None:
+            computersMove = self.chooseMove(COMPUTER)
+        moves = [playersMove, computersMove]
+
+        order = self.turnOrder()
+        triples = []
+        for attacker in order:
+            triples.append((self.battlers[attacker].pokemon,
+                            self.battlers[1 - attacker].pokemon,
+                            moves[attacker]))
+        damages = self.calculateDamages(triples)
+
+        attacks = []
+        for attacker, damage in zip(order, damages):
+            defender = self.battlers[1 - attacker]
+            attacks.append({"attacker": attacker, "defender": 1 - attacker,
+                            "move": moves[attacker], "damage": damage,
+                            "hpBefore": defender.hp})
+            defender.hp = max(0, defender.hp - damage)
+            if defender.isFainted():
+                self.winner = attacker
+                break
+        self.turns += 1
+        return attacks
+
+    def isOver(self):
+        return self.winner is not None
+
+
+def playBattle(battle, maxTurns=100):
+    """
+        Description: Plays a battle to the end with both sides picking random
+                     moves
+        Parameters: battle- the battle to play (Battle object),
+                    maxTurns- turns before it's called a draw, for Pokemon
+                    that can't damage each other (int)
+        Return Val: the winner's index (PLAYER or COMPUTER), None for a draw
+    """
+    while not battle.isOver() and battle.turns < maxTurns:
+        battle.playTurn(battle.chooseMove(PLAYER))
+    return battle.winner
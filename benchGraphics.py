@@ -0,0 +1,64 @@
+import os
+import random
+import sys
+import time
+
+if "--headless" in sys.argv:
+    # must be set before graphics is imported
+    sys.argv.remove("--headless")
+    os.environ["GRAPHICS_BACKEND"] = "headless"
+
+from graphics import GraphWin, Rectangle, Point
+
+"""
+    Description: Measures how fast a GraphWin draws and undraws many objects,
+                 e.g. to check that undrawing stays linear as a window fills
+                 up with items.
+
+    Usage: python benchGraphics.py [number of items, default 10000]
+           [--headless to run without a display]
+"""
+
+
+def benchmark(count=10000, seed=0):
+    """
+        Description: Draws count rectangles, then undraws them in random order
+        Parameters: count- number of rectangles (int),
+                    seed- seed for the undraw order (int)
+        Return Val: draws and undraws per second (tuple of float)
+    """
+    win = GraphWin("Graphics benchmark", 400, 400, autoflush=False)
+    rng = random.Random(seed)
+    shapes = []
+    for i in range(count):
+        x = rng.uniform(0, 390)
+        y = rng.uniform(0, 390)
+        shapes.append(Rectangle(Point(x, y), Point(x + 10, y + 10)))
+
+    start = time.perf_counter()
+    for shape in shapes:
+        shape.draw(win)
+    drawTime = time.perf_counter() - start
+
+    rng.shuffle(shapes)
+    start = time.perf_counter()
+    for shape in shapes:
+        shape.undraw()
+    undrawTime = time.perf_counter() - start
+
+    # tracking alone, without the Tk canvas calls
+    start = time.perf_counter()
+    for shape in shapes:
+        win.addItem(shape)
+    for shape in shapes:
+        win.delItem(shape)
+    trackTime = time.perf_counter() - start
+
+    win.close()
+    print("%d items: %.0f draws/s, %.0f undraws/s, %.0f add+remove/s" %
+          (count, count / drawTime, count / undrawTime, count / trackTime))
+    return count / drawTime, count / undrawTime
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,77 @@
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import requests
+
+"""
+    Description: HTTP client for the damage calculator API. One client keeps a
+                 pool of keep-alive connections open so attacks don't each pay
+                 for a new TLS handshake, every request has connect and read
+                 timeouts so a slow server can't hang the game, and failed
+                 requests are retried a few times with backoff.
+
+    Damage Calculator API: https://www.smogon.com/forums/threads/damage-calculator-api.3599759/
+"""
+
+DEFAULT_BASE_URL = "https://calc-api.herokuapp.com"
+
+
+class DamageCalcError(Exception):
+
+    """A damage request that couldn't be answered: the server couldn't be
+    reached or timed out, kept answering with an error status after the
+    retries, or sent back something that isn't a damage range"""
+
+
+class DamageCalcClient:
+
+    """Pooled, keep-alive client for the damage calculator API"""
+
+    def __init__(self, baseUrl=DEFAULT_BASE_URL, connectTimeout=3.05,
+                 readTimeout=10, retries=3, backoff=0.5, poolSize=8):
+        """
+            Parameters: baseUrl- where the API is served, e.g. a local
+                        stand-in server for testing (str),
+                        connectTimeout- seconds to wait for a connection,
+                        readTimeout- seconds to wait for a response,
+                        retries- how many times to retry a failed request,
+                        backoff- backoff factor between retries (seconds),
+                        poolSize- connections kept open to the server
+        """
+        self.baseUrl = baseUrl.rstrip("/")
+        self.timeout = (connectTimeout, readTimeout)
+
+        retry = Retry(total=retries, backoff_factor=backoff,
+                      status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=["POST"], raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=poolSize,
+                              max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def calculate(self, battleObject):
+        """
+            Description: Sends one damage request to the API
+            Parameters: battleObject- the request body, see
+                        damageCalc.buildBattleObject (dict)
+            Return Val: the API's response (dict)
+
+            Raises DamageCalcError if the request fails.
+        """
+        try:
+            response = self.session.post(self.baseUrl + "/calc-api",
+                                         json=battleObject,
+                                         timeout=self.timeout)
+            # retries are used up by now, so an error status is final
+            response.raise_for_status()
+            battleData = response.json()
+        except (requests.RequestException, ValueError) as error:
+            raise DamageCalcError("damage request for %s failed: %s" %
+                                  (battleObject.get("move"), error)) from error
+        if not isinstance(battleData, dict):
+            raise DamageCalcError("damage request for %s got %r back" %
+                                  (battleObject.get("move"), battleData))
+        return battleData
+
+    def close(self):
+        self.session.close()
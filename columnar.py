@@ -0,0 +1,165 @@
+from dataCache import loadDatasets
+from typeChart import typeId
+from records import CATEGORIES
+import numpy as np
+import sys
+
+"""
+    Description: Column-oriented copy of the Pokemon and move data for
+                 analysis with numpy. Species and moves are structured
+                 arrays (one field per stat), and movepools are stored in
+                 CSR form: movepoolMoves holds every species' move IDs back
+                 to back and movepoolOffsets[i]:movepoolOffsets[i + 1] is
+                 species i's slice of it.
+
+    Usage: python columnar.py [output.npz]
+"""
+
+COLUMNS_FILE = "pokedex-columns.npz"
+
+NO_TYPE = -1   # type2 of single-typed species
+NO_VALUE = -1  # Power/Accuracy/PP of moves without one ("None" in the csv)
+
+SPECIES_DTYPE = np.dtype([
+    ("id", np.uint16), ("name", "U32"), ("type1", np.int8), ("type2", np.int8),
+    ("tier", "U8"), ("hp", np.uint16), ("attack", np.uint16),
+    ("defense", np.uint16), ("spAttack", np.uint16),
+    ("spDefense", np.uint16), ("speed", np.uint16)])
+
+MOVE_DTYPE = np.dtype([
+    ("id", np.uint16), ("name", "U32"), ("type", np.int8),
+    ("category", np.int8), ("power", np.int16), ("accuracy", np.int16),
+    ("pp", np.int16)])
+
+
+class ColumnarData:
+
+    """The roster and moves as numpy columns"""
+
+    def __init__(self, species, moves, movepoolOffsets, movepoolMoves):
+        """
+            Parameters: species- one row per species (SPECIES_DTYPE array),
+                        moves- one row per move (MOVE_DTYPE array),
+                        movepoolOffsets- where each species' moves start in
+                        movepoolMoves, plus the end (int array, length
+                        species + 1),
+                        movepoolMoves- every movepool's move IDs (uint16
+                        array)
+        """
+        self.species = species
+        self.moves = moves
+        self.movepoolOffsets = movepoolOffsets
+        self.movepoolMoves = movepoolMoves
+
+    def movepool(self, speciesId):
+        """Gets one species' move IDs (uint16 array)"""
+        return self.movepoolMoves[self.movepoolOffsets[speciesId]:
+                                  self.movepoolOffsets[speciesId + 1]]
+
+    def movepoolOwners(self):
+        """Gets the species ID of every entry in movepoolMoves (int array)"""
+        return np.repeat(np.arange(len(self.species)),
+                         np.diff(self.movepoolOffsets))
+
+    def learners(self, moveId):
+        """Gets the IDs of every species that learns a move (int array)"""
+        return np.unique(self.movepoolOwners()[self.movepoolMoves == moveId])
+
+    def baseStatTotals(self):
+        """Gets every species' base stat total (int array)"""
+        total = np.zeros(len(self.species), dtype=np.int32)
+        for field in ["hp", "attack", "defense", "spAttack", "spDefense",
+                      "speed"]:
+            total += self.species[field]
+        return total
+
+    def save(self, filename=COLUMNS_FILE):
+        np.savez(filename, species=self.species, moves=self.moves,
+                 movepoolOffsets=self.movepoolOffsets,
+                 movepoolMoves=self.movepoolMoves)
+
+    @classmethod
+    def load(cls, filename=COLUMNS_FILE):
+        with np.load(filename) as data:
+            return cls(data["species"], data["moves"],
+                       data["movepoolOffsets"], data["movepoolMoves"])
+
+
+def readColumns(pokemonFile="pokemon-data.csv", moveFile="move-data.csv"):
+    """
+        Description: Loads the data files into columns
+        Parameters: pokemonFile, moveFile- the data files (str)
+        Return Val: the data (ColumnarData object)
+    """
+    pokemonRecords, moveRecords = loadDatasets(pokemonFile, moveFile)
+    return buildColumns(pokemonRecords, moveRecords)
+
+
+def buildColumns(pokemonRecords, moveRecords):
+    """
+        Description: Converts records into columns
+        Parameters: pokemonRecords- the roster, in ID order (list of
+                    PokemonRecord objects),
+                    moveRecords- every move, in ID order (list of MoveRecord)
+        Return Val: the data (ColumnarData object)
+    """
+    species = np.zeros(len(pokemonRecords), dtype=SPECIES_DTYPE)
+    for row, pokemon in zip(species, pokemonRecords):
+        typeIds = pokemon.typeIds + (NO_TYPE,)
+        row["id"] = pokemon.id
+        row["name"] = pokemon.name
+        row["type1"] = typeIds[0]
+        row["type2"] = typeIds[1]
+        row["tier"] = pokemon.tier
+        row["hp"] = pokemon.hp
+        row["attack"] = pokemon.attack
+        row["defense"] = pokemon.defense
+        row["spAttack"] = pokemon.spAttack
+        row["spDefense"] = pokemon.spDefense
+        row["speed"] = pokemon.speed
+
+    moves = np.zeros(len(moveRecords), dtype=MOVE_DTYPE)
+    for row, move in zip(moves, moveRecords):
+        row["id"] = move.id
+        row["name"] = move.name
+        row["type"] = move.typeId
+        row["category"] = move.categoryId
+        for field in ["power", "accuracy", "pp"]:
+            value = getattr(move, field)
+            row[field] = NO_VALUE if value is None else value
+
+    lengths = [len(pokemon.moveIds) for pokemon in pokemonRecords]
+    movepoolOffsets = np.zeros(len(pokemonRecords) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=movepoolOffsets[1:])
+    movepoolMoves = np.zeros(movepoolOffsets[-1], dtype=np.uint16)
+    for pokemon, start in zip(pokemonRecords, movepoolOffsets):
+        movepoolMoves[start:start + len(pokemon.moveIds)] = pokemon.moveIds
+
+    return ColumnarData(species, moves, movepoolOffsets, movepoolMoves)
+
+
+def main():
+    filename = sys.argv[1] if len(sys.argv) > 1 else COLUMNS_FILE
+    columns = readColumns()
+    columns.save(filename)
+
+    # a few column queries, none of them loop over rows in Python
+    species = columns.species
+    fastest = species[np.argsort(species["speed"])[::-1][:5]]
+    print("Fastest:", ", ".join(fastest["name"]))
+    totals = columns.baseStatTotals()
+    for tier in np.unique(species["tier"]):
+        print("%s mean base stat total: %.1f" %
+              (tier, totals[species["tier"] == tier].mean()))
+    moves = columns.moves
+    strong = moves[(moves["power"] >= 100) &
+                   (moves["category"] != CATEGORIES["Status"])]
+    print("%d moves with 100+ power" % len(strong))
+    waterType = typeId("Water")
+    water = (species["type1"] == waterType) | (species["type2"] == waterType)
+    print("Water types:", ", ".join(species[water]["name"]))
+    print("Saved to", filename)
+
+
+if __name__ == '__main__':
+    main()
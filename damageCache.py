@@ -0,0 +1,203 @@
+from collections import OrderedDict
+from damageCalc import buildBattleObject, isDamageRange
+import json
+import os
+import sqlite3
+import threading
+
+"""
+    Description: Two level cache of damage ranges. Recently used results are
+                 kept in a bounded in-memory LRU, and results that are slow
+                 to get again (from the damage calculator API) are also
+                 saved to an sqlite file so they survive restarts. The file
+                 remembers the size and modification time of the data files
+                 it was filled from and is cleared if they change.
+"""
+
+DATA_FILES = ["pokemon-data.csv", "move-data.csv"]
+
+
+def requestKey(calculatorName, attackingPokemon, defendingPokemon, move):
+    """
+        Description: Builds the cache key for a damage request from the parts
+                     of the request body that affect the result
+        Parameters: calculatorName- which calculator answers the request (str),
+                    attackingPokemon- the attacking Pokemon (PokemonRecord),
+                    defendingPokemon- the defending Pokemon (PokemonRecord),
+                    move- the move used (MoveRecord object)
+        Return Val: the cache key (str)
+    """
+    battleObject = buildBattleObject(attackingPokemon, defendingPokemon, move)
+    key = [calculatorName]
+    for side in ("attacker", "defender"):
+        stats = battleObject[side]
+        key.append([stats["species"], stats["ability"], stats["item"],
+                    stats["level"], stats["nature"]])
+    key.append(battleObject["move"])
+    return json.dumps(key)
+
+
+def dataFileSignature(dataFiles):
+    """
+        Description: Describes the current version of the data files
+        Parameters: dataFiles- the data file names (list of str)
+        Return Val: size and modification time of each file (str)
+    """
+    signature = []
+    for filename in dataFiles:
+        if os.path.exists(filename):
+            info = os.stat(filename)
+            signature.append([filename, info.st_size, info.st_mtime_ns])
+        else:
+            signature.append([filename, None, None])
+    return json.dumps(signature)
+
+
+class DamageCache:
+
+    """In-memory LRU of damage ranges in front of an sqlite file"""
+
+    def __init__(self, filename="damage-cache.sqlite3", maxSize=1024,
+                 dataFiles=DATA_FILES):
+        self.maxSize = maxSize
+        self.dataFiles = dataFiles
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.diskHits = 0
+        self.misses = 0
+        self.evictions = 0
+        # batches look up damage from several threads at once
+        self.lock = threading.RLock()
+
+        self.db = sqlite3.connect(filename, check_same_thread=False)
+        self.db.execute("CREATE TABLE IF NOT EXISTS damage "
+                        "(key TEXT PRIMARY KEY, result TEXT)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta "
+                        "(name TEXT PRIMARY KEY, value TEXT)")
+        self.db.commit()
+        self.checkDataFiles()
+
+    def checkDataFiles(self):
+        """
+            Description: Clears the cache if the data files have changed since
+                         it was filled
+            Parameters: None
+            Return Val: True if the cache was cleared (bool)
+        """
+        with self.lock:
+            signature = dataFileSignature(self.dataFiles)
+            row = self.db.execute("SELECT value FROM meta WHERE name = ?",
+                                  ("dataFiles",)).fetchone()
+            if row is not None and row[0] == signature:
+                return False
+            self.invalidate()
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                            ("dataFiles", signature))
+            self.db.commit()
+            return row is not None
+
+    def invalidate(self, key=None):
+        """
+            Description: Removes an entry, or every entry, from both levels
+            Parameters: key- the entry to remove, or None for all (str)
+            Return Val: None
+        """
+        with self.lock:
+            if key is None:
+                self.memory.clear()
+                self.db.execute("DELETE FROM damage")
+            else:
+                self.memory.pop(key, None)
+                self.db.execute("DELETE FROM damage WHERE key = ?", (key,))
+            self.db.commit()
+
+    def get(self, key):
+        """
+            Description: Looks up a damage range
+            Parameters: key- the cache key from requestKey (str)
+            Return Val: the damage range (dict), None if it isn't cached
+        """
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.hits += 1
+                return self.memory[key]
+
+            row = self.db.execute("SELECT result FROM damage WHERE key = ?",
+                                  (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.diskHits += 1
+            result = json.loads(row[0])
+            self._remember(key, result)
+            return result
+
+    def put(self, key, result, persist=True):
+        """
+            Description: Saves a damage range in memory, and on disk too if
+                         persist is set
+            Parameters: key- the cache key from requestKey (str),
+                        result- the damage range (dict),
+                        persist- also write it to the sqlite file (bool)
+            Return Val: None
+        """
+        with self.lock:
+            self._remember(key, result)
+            if not persist:
+                return
+            self.db.execute("INSERT OR REPLACE INTO damage VALUES (?, ?)",
+                            (key, json.dumps(result)))
+            self.db.commit()
+
+    def _remember(self, key, result):
+        self.memory[key] = result
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.maxSize:
+            self.memory.popitem(last=False)
+            self.evictions += 1
+
+    def getOrCalculate(self, attackingPokemon, defendingPokemon, move,
+                       calculate, persist=True):
+        """
+            Description: Gets a damage range from the cache, calculating and
+                         saving it on a miss
+            Parameters: attackingPokemon- the attacking Pokemon (PokemonRecord),
+                        defendingPokemon- the defending Pokemon (PokemonRecord),
+                        move- the move used (MoveRecord object),
+                        calculate- damage range function with the same
+                        parameters (e.g. damageCalc.remoteDamageRange),
+                        persist- save new results on disk as well as in
+                        memory; off for calculators that are quicker to
+                        rerun than a committed sqlite write, like
+                        damageCalc.localDamageRange (bool)
+            Return Val: the damage range (dict). Only usable ranges are saved
+                        (see damageCalc.isDamageRange); an error reply is
+                        passed back without being cached.
+        """
+        key = requestKey(calculate.__name__, attackingPokemon,
+                         defendingPokemon, move)
+        result = self.get(key)
+        if result is not None and not isDamageRange(result):
+            # left by an older version that saved errors; worked out again
+            self.invalidate(key)
+            result = None
+        if result is None:
+            # an exception from calculate isn't caught, so it's never saved
+            result = calculate(attackingPokemon, defendingPokemon, move)
+            if isDamageRange(result):
+                self.put(key, result, persist)
+        return result
+
+    def getStats(self):
+        """
+            Description: Gets the cache's counters
+            Parameters: None
+            Return Val: hits, diskHits, misses, evictions and size (dict)
+        """
+        return {"hits": self.hits, "diskHits": self.diskHits,
+                "misses": self.misses, "evictions": self.evictions,
+                "size": len(self.memory)}
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,257 @@
+from typeChart import effectiveness
+from records import PHYSICAL, STATUS
+from calcClient import DamageCalcClient, DamageCalcError
+from concurrent.futures import ThreadPoolExecutor
+import random
+
+"""
+    Description: Local damage calculator. Works out the min/max damage a move
+                 does (as a percentage of the defender's HP) with the same
+                 battle settings calculateDamage used to send to the Smogon
+                 damage calculator API: level 100, Serious nature, no EVs,
+                 31 IVs, and abilities/items that have no effect.
+
+    Damage formula: https://bulbapedia.bulbagarden.net/wiki/Damage
+    Stat formula: https://bulbapedia.bulbagarden.net/wiki/Stat
+"""
+
+LEVEL = 100
+IV = 31
+
+# moves whose base power isn't in move-data.csv (max happiness Return, and
+# Low Kick/Grass Knot at a middle weight class since we have no weights)
+VARIABLE_POWER = {"Return": 102, "Low Kick": 60, "Grass Knot": 60}
+
+# moves that always do damage equal to the user's level
+LEVEL_DAMAGE = ["Seismic Toss", "Night Shade"]
+
+# shared client for the damage calculator API, created on first use
+# (DamageCalcClient); replace it to use a different server or timeouts
+calcClient = None
+
+
+def calcHP(baseHP):
+    """
+        Description: Calculates a Pokemon's max HP from its base HP
+        Parameters: baseHP- the base HP stat (int)
+        Return Val: the max HP (int)
+    """
+    return (2 * baseHP + IV) * LEVEL // 100 + LEVEL + 10
+
+
+def calcStat(baseStat):
+    """
+        Description: Calculates a Pokemon's (non-HP) stat from its base stat
+        Parameters: baseStat- the base stat (int)
+        Return Val: the stat at LEVEL with a neutral nature (int)
+    """
+    return (2 * baseStat + IV) * LEVEL // 100 + 5
+
+
+def getMovePower(move, attackingPokemon, defendingPokemon):
+    """
+        Description: Gets the base power of a move
+        Parameters: move- the move used (MoveRecord object),
+                    attackingPokemon- the attacking Pokemon (PokemonRecord),
+                    defendingPokemon- the defending Pokemon (PokemonRecord)
+        Return Val: the base power (int), None if the move does no damage
+    """
+    if move.power is not None:
+        return move.power
+    if move.name == "Gyro Ball":
+        attackerSpeed = calcStat(attackingPokemon.speed)
+        defenderSpeed = calcStat(defendingPokemon.speed)
+        return min(150, 25 * defenderSpeed // attackerSpeed + 1)
+    return VARIABLE_POWER.get(move.name)
+
+
+def localDamageRange(attackingPokemon, defendingPokemon, move):
+    """
+        Description: Calculates the damage range of a move without the API
+        Parameters: attackingPokemon- the attacking Pokemon (PokemonRecord),
+                    defendingPokemon- the defending Pokemon (PokemonRecord),
+                    move- the move used (MoveRecord object)
+        Return Val: min and max damage as a percentage of the defending
+                    Pokemon's HP (dict with "min" and "max")
+    """
+    if move.categoryId == STATUS:
+        return {"min": 0, "max": 0}
+
+    multiplier = effectiveness(move.typeId, defendingPokemon.typeIds)
+    defenderHP = calcHP(defendingPokemon.hp)
+    if multiplier == 0:
+        # defending Pokemon is immune to the move
+        return {"min": 0, "max": 0}
+
+    if move.name in LEVEL_DAMAGE:
+        damage = LEVEL * 100 / defenderHP
+        return {"min": damage, "max": damage}
+    if move.name == "Psywave":
+        return {"min": LEVEL // 2 * 100 / defenderHP,
+                "max": LEVEL * 3 // 2 * 100 / defenderHP}
+
+    power = getMovePower(move, attackingPokemon, defendingPokemon)
+    if power is None:
+        return {"min": 0, "max": 0}
+
+    if move.categoryId == PHYSICAL:
+        attack = calcStat(attackingPokemon.attack)
+        defense = calcStat(defendingPokemon.defense)
+    else:
+        attack = calcStat(attackingPokemon.spAttack)
+        defense = calcStat(defendingPokemon.spDefense)
+
+    baseDamage = (2 * LEVEL // 5 + 2) * power * attack // defense // 50 + 2
+
+    # random roll is between 85% and 100%, then STAB and type effectiveness
+    # are applied to each end of the range
+    damages = []
+    for roll in (85, 100):
+        damage = baseDamage * roll // 100
+        if move.typeId in attackingPokemon.typeIds:
+            damage = damage * 3 // 2
+        damage = int(damage * multiplier)
+        damages.append(max(1, damage) * 100 / defenderHP)
+
+    return {"min": damages[0], "max": damages[1]}
+
+
+def isDamageRange(battleData):
+    """
+        Description: Checks that a calculator's answer is a damage range that
+                     can be used (and cached), not an error or a partial reply
+        Parameters: battleData- the answer (dict)
+        Return Val: True if it has a numeric "min" and "max", or is the API's
+                    answer for an immune defender (no range and 0 damage)
+                    (bool)
+    """
+    if not isinstance(battleData, dict) or "error" in battleData:
+        return False
+    if "min" in battleData or "max" in battleData:
+        return all(isinstance(battleData.get(x), (int, float)) and
+                   not isinstance(battleData.get(x), bool)
+                   for x in ("min", "max"))
+    # the API leaves the range out when the defending Pokemon is immune, and
+    # reports its damage as 0 (or a list of 0 rolls)
+    damage = battleData.get("damage")
+    if isinstance(damage, list):
+        return len(damage) > 0 and all(x == 0 for x in damage)
+    return damage == 0
+
+
+def rollDamage(battleData, rng=random):
+    """
+        Description: Picks the damage a move does from its damage range
+        Parameters: battleData- the damage range (dict),
+                    rng- random number generator to use (random.Random)
+        Return Val: damage the move deals to the opposing Pokemon (int)
+    """
+    # gets min damage from battle data; uses 0 if not there (defending Pokemon
+    # immune to move)
+    minDamage = battleData.get("min", 0)
+
+    # gets max damage from battle data; uses 0 if not there (defending Pokemon
+    # immune to move)
+    maxDamage = battleData.get("max", 0)
+
+    percentageRoll = int(rng.uniform(minDamage, maxDamage))
+    return percentageRoll
+
+
+def buildPokemonStats(pokemon):
+    """
+        Description: Builds the attacker/defender object the damage calculator
+                     API expects for a Pokemon
+        Parameters: pokemon- the Pokemon (PokemonRecord object)
+        Return Val: the API's Pokemon object (dict)
+    """
+    return {
+        # species name AS IT IS IN THE POKEDEX [REQUIRED]
+        "species": pokemon.name,
+
+        # ability [REQUIRED] (Mold Breaker negates abilities)
+        "ability": "Mold Breaker",
+
+        # item [REQUIRED] (Cleanse Tag is practically useless in battle. Items
+        # won't give an advantage to either side)
+        "item": "Cleanse Tag",
+
+        "level": LEVEL,  # level [REQUIRED], must be a number
+
+        "nature": "Serious",  # not required, defaults to serious
+
+        # not required, defaults to 0 in all stats. Valid stats are "hp", "atk",
+        # "spa", "def", "spd", "spe"
+        "evs": {},
+
+        "ivs": {}  # not required, defaults to 31 in any stat not specified
+    }
+
+
+def buildBattleObject(attackingPokemon, defendingPokemon, move):
+    """
+        Description: Builds the damage calculator API's request body
+        Parameters: attackingPokemon- the attacking Pokemon (PokemonRecord),
+                    defendingPokemon- the defending Pokemon (PokemonRecord),
+                    move- the move used (MoveRecord object)
+        Return Val: the request body (dict)
+    """
+    return {
+        "attacker": buildPokemonStats(attackingPokemon),
+        "defender": buildPokemonStats(defendingPokemon),
+        "move": move.name
+    }
+
+
+def remoteDamageRange(attackingPokemon, defendingPokemon, move):
+    """
+        Description: Gets the damage range of a move from the damage
+                     calculator API
+        Parameters: attackingPokemon- the attacking Pokemon (PokemonRecord),
+                    defendingPokemon- the defending Pokemon (PokemonRecord),
+                    move- the move used (MoveRecord object)
+        Return Val: the API's response (dict with "min" and "max" unless the
+                    defending Pokemon is immune to the move)
+
+        Raises DamageCalcError if the API can't be reached, answers with an
+        error, or its answer isn't a damage range (see isDamageRange).
+
+        Damage Calculator API: https://www.smogon.com/forums/threads/damage-calculator-api.3599759/
+        Damage Calculator GitHub: https://github.com/smogon/damage-calc
+        Damage Calculator Web App: https://calc.pokemonshowdown.com/
+    """
+    global calcClient
+    if calcClient is None:
+        calcClient = DamageCalcClient()
+
+    battleObject = buildBattleObject(attackingPokemon, defendingPokemon, move)
+    battleData = calcClient.calculate(battleObject)
+    if not isDamageRange(battleData):
+        raise DamageCalcError("damage request for %s got no damage range: %r"
+                              % (move.name, battleData))
+    return battleData
+
+
+def damageRangeBatch(triples, calculate=localDamageRange, maxWorkers=8):
+    """
+        Description: Gets the damage ranges of several moves at once, with up
+                     to maxWorkers requests in flight at the same time
+        Parameters: triples- (attackingPokemon, defendingPokemon, move) for
+                    each move (list of tuples),
+                    calculate- damage range function taking those three
+                    parameters (e.g. remoteDamageRange),
+                    maxWorkers- the most requests resolved at once (int)
+        Return Val: the damage range for each triple, in the same order
+                    (list of dict). If a request fails, its entry is
+                    {"error": the exception} and the others are unaffected.
+    """
+    def calculateOne(triple):
+        try:
+            return calculate(*triple)
+        except Exception as error:
+            return {"error": error}
+
+    if len(triples) <= 1:
+        return [calculateOne(triple) for triple in triples]
+    with ThreadPoolExecutor(max_workers=min(maxWorkers, len(triples))) as pool:
+        return list(pool.map(calculateOne, triples))
@@ -0,0 +1,142 @@
+from damageCalc import VARIABLE_POWER, LEVEL_DAMAGE, LEVEL, IV
+from typeChart import EFFECTIVENESS, TYPE_COUNT
+from records import PHYSICAL, STATUS
+import numpy as np
+
+"""
+    Description: Precomputes the damage range of every (attacker, defender,
+                 move) triple so damage lookups don't have to redo the damage
+                 formula. The matrix is built with numpy array operations over
+                 the whole roster at once and gives the same numbers as
+                 damageCalc.localDamageRange.
+"""
+
+class DamageMatrix:
+
+    """Min/max damage (% of the defender's HP) for every attacker, defender
+    and move in the roster's movepools"""
+
+    def __init__(self, pokemonRecords, moveRecords):
+        """
+            Parameters: pokemonRecords- the roster, in ID order (list of
+                        PokemonRecord objects),
+                        moveRecords- every move, in ID order (list of
+                        MoveRecord objects)
+        """
+        # only moves that are in some movepool get a column; moveColumns
+        # maps a move ID to its column (-1 for none)
+        self.moveColumns = [-1] * len(moveRecords)
+        self.moves = []
+        for pokemon in pokemonRecords:
+            for moveId in pokemon.moveIds:
+                if self.moveColumns[moveId] == -1:
+                    self.moveColumns[moveId] = len(self.moves)
+                    self.moves.append(moveRecords[moveId])
+
+        self.minDamage, self.maxDamage = self._build(pokemonRecords)
+
+    def _build(self, pokemonRecords):
+        typeChart = np.array(EFFECTIVENESS).reshape(TYPE_COUNT, TYPE_COUNT)
+
+        def stats(name):
+            return np.array([getattr(p, name) for p in pokemonRecords])
+
+        hp = (2 * stats("hp") + IV) * LEVEL // 100 + LEVEL + 10
+        attack = (2 * stats("attack") + IV) * LEVEL // 100 + 5
+        defense = (2 * stats("defense") + IV) * LEVEL // 100 + 5
+        spAttack = (2 * stats("spAttack") + IV) * LEVEL // 100 + 5
+        spDefense = (2 * stats("spDefense") + IV) * LEVEL // 100 + 5
+        speed = (2 * stats("speed") + IV) * LEVEL // 100 + 5
+
+        # species x type membership, so effectiveness is a product over types
+        speciesTypes = np.zeros((len(pokemonRecords), TYPE_COUNT), bool)
+        for i, pokemon in enumerate(pokemonRecords):
+            speciesTypes[i, list(pokemon.typeIds)] = True
+
+        moveCount = len(self.moves)
+        power = np.array([move.power or VARIABLE_POWER.get(move.name, 0)
+                          for move in self.moves], dtype=np.int64)
+        category = np.array([move.categoryId for move in self.moves])
+        moveType = np.array([move.typeId for move in self.moves],
+                            dtype=np.int64)
+        levelDamage = np.array([move.name in LEVEL_DAMAGE
+                                for move in self.moves], bool)
+        hasPower = (power > 0) | levelDamage | np.array(
+            [move.name in ("Gyro Ball", "Psywave") for move in self.moves],
+            bool)
+        gyroBall = self._column("Gyro Ball")
+        psywave = self._column("Psywave")
+
+        # defender x move effectiveness: multiply the chart rows of each of
+        # the defender's types (unused types contribute 1)
+        moveChart = typeChart[moveType]  # move x defending type
+        effectiveness = np.prod(np.where(speciesTypes[:, None, :],
+                                         moveChart[None, :, :], 1.0), axis=2)
+
+        physical = category == PHYSICAL
+        attackStat = np.where(physical, attack[:, None], spAttack[:, None])
+        defenseStat = np.where(physical, defense[:, None], spDefense[:, None])
+
+        # attacker x defender x move
+        movePower = np.broadcast_to(power, (len(pokemonRecords),
+                                            len(pokemonRecords), moveCount))
+        if gyroBall is not None:
+            gyroPower = np.minimum(150, 25 * speed[None, :] // speed[:, None]
+                                   + 1)
+            movePower = movePower.copy()
+            movePower[:, :, gyroBall] = gyroPower
+
+        baseDamage = ((2 * LEVEL // 5 + 2) * movePower * attackStat[:, None, :]
+                      // defenseStat[None, :, :] // 50 + 2)
+
+        # attacker x move same-type attack bonus
+        stab = speciesTypes[:, moveType]
+
+        damages = []
+        for roll in (85, 100):
+            damage = baseDamage * roll // 100
+            damage = np.where(stab[:, None, :], damage * 3 // 2, damage)
+            damage = np.floor(damage * effectiveness[None, :, :])
+            damage = np.maximum(1, damage)
+            damage = np.where(levelDamage, LEVEL, damage)
+            damages.append(damage * 100 / hp[None, :, None])
+
+        # status moves, moves with no power and immunities do no damage
+        noDamage = (category == STATUS) | ~hasPower
+        noDamage = noDamage[None, None, :] | (effectiveness == 0)[None, :, :]
+
+        minDamage = np.where(noDamage, 0.0, damages[0])
+        maxDamage = np.where(noDamage, 0.0, damages[1])
+
+        if psywave is not None:
+            immune = effectiveness[:, psywave] == 0
+            minDamage[:, :, psywave] = np.where(immune, 0,
+                                                LEVEL // 2 * 100 / hp)
+            maxDamage[:, :, psywave] = np.where(immune, 0,
+                                                LEVEL * 3 // 2 * 100 / hp)
+
+        return minDamage, maxDamage
+
+    def _column(self, moveName):
+        for column, move in enumerate(self.moves):
+            if move.name == moveName:
+                return column
+        return None
+
+    def lookup(self, attackingPokemon, defendingPokemon, move):
+        """
+            Description: Looks up the damage range of a move
+            Parameters: attackingPokemon- the attacking Pokemon (PokemonRecord),
+                        defendingPokemon- the defending Pokemon (PokemonRecord),
+                        move- the move used (MoveRecord object)
+            Return Val: min and max damage as a percentage of the defending
+                        Pokemon's HP (dict with "min" and "max"), None if the
+                        move isn't in any movepool
+        """
+        column = self.moveColumns[move.id]
+        if column == -1:
+            return None
+        attacker = attackingPokemon.id
+        defender = defendingPokemon.id
+        return {"min": float(self.minDamage[attacker, defender, column]),
+                "max": float(self.maxDamage[attacker, defender, column])}
@@ -0,0 +1,162 @@
+from records import readMoveRecords, readPokemonRecords
+import hashlib
+import os
+import pickle
+import time
+
+"""
+    Description: Binary snapshot of the parsed data files. The first load
+                 parses pokemon-data.csv and move-data.csv into records and
+                 pickles them to one file; later loads read that file in one
+                 go as long as the CSV files haven't changed (same size and
+                 modification time, or failing that the same contents).
+
+    Usage: python dataCache.py compares a cold parse with a cached load
+"""
+
+CACHE_FILE = "data-cache.pickle"
+
+# bump when the record classes change so old snapshots are rebuilt
+CACHE_VERSION = 2
+
+
+def describeFile(filename):
+    """
+        Description: Gets what a snapshot remembers about a source file
+        Parameters: filename- the file (str)
+        Return Val: size, modification time and SHA-1 of the file (dict)
+    """
+    info = os.stat(filename)
+    with open(filename, "rb") as infile:
+        digest = hashlib.sha1(infile.read()).hexdigest()
+    return {"size": info.st_size, "mtime": info.st_mtime_ns, "sha1": digest}
+
+
+def isUnchanged(filename, described):
+    """
+        Description: Checks a source file against what a snapshot remembers.
+                     Size and modification time are checked first; the file
+                     is only hashed if they differ (e.g. after a checkout).
+        Parameters: filename- the file (str),
+                    described- from describeFile (dict)
+        Return Val: True if the file's contents are the same (bool)
+    """
+    info = os.stat(filename)
+    if info.st_size == described["size"] and \
+            info.st_mtime_ns == described["mtime"]:
+        return True
+    return describeFile(filename)["sha1"] == described["sha1"]
+
+
+def readSnapshot(cacheFile, pokemonFile, moveFile):
+    """
+        Description: Reads a snapshot if it's still valid
+        Parameters: cacheFile- the snapshot file (str),
+                    pokemonFile, moveFile- the source files (str)
+        Return Val: (pokemonRecords, moveRecords), None if there's no valid
+                    snapshot
+    """
+    if not os.path.exists(cacheFile):
+        return None
+    # an old, foreign or damaged snapshot is treated as no snapshot, however
+    # it turns out to be wrong
+    try:
+        with open(cacheFile, "rb") as infile:
+            snapshot = pickle.loads(infile.read())
+        if not isinstance(snapshot, dict) or \
+                snapshot.get("version") != CACHE_VERSION:
+            return None
+        sources = snapshot.get("sources")
+        if not isinstance(sources, dict) or \
+                set(sources) != {pokemonFile, moveFile}:
+            return None
+        for filename, described in sources.items():
+            if not os.path.exists(filename) or \
+                    not isUnchanged(filename, described):
+                return None
+        pokemonRecords = snapshot.get("pokemon")
+        moveRecords = snapshot.get("moves")
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError,
+            ImportError, ValueError, TypeError, KeyError, IndexError):
+        return None
+    if not isinstance(pokemonRecords, list) or \
+            not isinstance(moveRecords, list):
+        return None
+    return pokemonRecords, moveRecords
+
+
+def writeSnapshot(cacheFile, pokemonFile, moveFile, pokemonRecords,
+                  moveRecords):
+    """
+        Description: Saves parsed records as a snapshot
+        Parameters: cacheFile- the snapshot file (str),
+                    pokemonFile, moveFile- the source files (str),
+                    pokemonRecords, moveRecords- the parsed records (lists)
+        Return Val: None
+    """
+    snapshot = {
+        "version": CACHE_VERSION,
+        "sources": {pokemonFile: describeFile(pokemonFile),
+                    moveFile: describeFile(moveFile)},
+        "pokemon": pokemonRecords,
+        "moves": moveRecords,
+    }
+    # write to a temporary file first so a crash can't leave half a snapshot
+    tmpFile = cacheFile + ".tmp"
+    with open(tmpFile, "wb") as outfile:
+        outfile.write(pickle.dumps(snapshot, pickle.HIGHEST_PROTOCOL))
+    os.replace(tmpFile, cacheFile)
+
+
+def loadDatasets(pokemonFile="pokemon-data.csv", moveFile="move-data.csv",
+                 cacheFile=CACHE_FILE):
+    """
+        Description: Loads the Pokemon and move records, from the snapshot if
+                     it's valid, otherwise by parsing the CSV files (and then
+                     saving a new snapshot)
+        Parameters: pokemonFile, moveFile- the source files (str),
+                    cacheFile- the snapshot file, None to always parse (str)
+        Return Val: (pokemonRecords, moveRecords) (tuple of lists)
+    """
+    if cacheFile is not None:
+        datasets = readSnapshot(cacheFile, pokemonFile, moveFile)
+        if datasets is not None:
+            return datasets
+
+    moveRecords = readMoveRecords(moveFile)
+    pokemonRecords = readPokemonRecords(pokemonFile, moveRecords)
+    if cacheFile is not None:
+        try:
+            writeSnapshot(cacheFile, pokemonFile, moveFile, pokemonRecords,
+                          moveRecords)
+        except OSError as error:
+            # a read-only checkout can still play, just without the snapshot
+            print("Could not save data snapshot: ", error)
+    return pokemonRecords, moveRecords
+
+
+def benchmark(repeats=20):
+    """
+        Description: Times a cold parse of the CSV files against loading the
+                     snapshot
+        Parameters: repeats- loads to average over (int)
+        Return Val: None
+    """
+    start = time.perf_counter()
+    for i in range(repeats):
+        loadDatasets(cacheFile=None)
+    parseTime = (time.perf_counter() - start) / repeats
+
+    loadDatasets()  # makes sure the snapshot exists
+    start = time.perf_counter()
+    for i in range(repeats):
+        loadDatasets()
+    cachedTime = (time.perf_counter() - start) / repeats
+
+    print("cold parse:  %.2f ms" % (parseTime * 1000))
+    print("cached load: %.2f ms (%.1fx faster)" %
+          (cachedTime * 1000, parseTime / cachedTime))
+
+
+if __name__ == '__main__':
+    benchmark()
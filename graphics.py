@@ -62,6 +62,28 @@ http://mcsp.wartburg.edu/zelle/python for a quick reference"""
 
 __version__ = "5.0"
 
+# pokePlay changes
+#     * Image accepts an already loaded Tk image as well as a file name
+#     * GraphWin.items is an insertion-ordered dict, so adding and removing
+#       items is O(1) instead of a list scan; redraw order is unchanged
+#     * GraphWin.batch() holds back autoflush updates until the end of a
+#       with block, so a frame's worth of changes costs one update
+#     * Shapes, Text and Image can be changed while drawn (setPoints,
+#       setAnchor, setImage); the existing canvas item is updated instead of
+#       undrawing and drawing a new object
+#     * The Tk root is made when the first window is, not on import (see
+#       getRoot), and setting GRAPHICS_BACKEND=headless before importing
+#       swaps Tk for an in-memory canvas that records what's drawn and can
+#       rasterize it with PIL (see HeadlessCanvas)
+#     * GraphWin.enableMetrics() counts draw/undraw/move/reconfig calls and
+#       times every update, with frames per second and the longest frame,
+#       optionally shown in the corner of the window (see RenderMetrics)
+#     * Image reads and writes whole regions of pixels in one call
+#       (getPixels, setPixels, getPixelArray) and converts to and from PIL
+#       images in memory (toPIL, Image.fromPIL, photoFromPIL)
+#     * Photo images can be loaded and cropped, and buttons made, the same
+#       way with either backend (photoFromFile, cropPhoto, makeButton)
+
 # Version 5 8/26/2016
 #     * update at bottom to fix MacOS issue causing askopenfile() to hang
 #     * update takes an optional parameter specifying update rate
@@ -160,13 +182,24 @@ __version__ = "5.0"
 #     Added ability to set text atttributes.
 #     Added Entry boxes.
 
-import time, os, sys
+import time, os, sys, heapq, itertools, collections, base64, io
+from contextlib import contextmanager
 
 try:  # import as appropriate for 2.x vs. 3.x
    import tkinter as tk
 except:
    import Tkinter as tk
 
+try:  # only needed by the headless backend, to load and rasterize images
+    from PIL import Image as _PILImage, ImageDraw as _PILDraw, \
+        ImageColor as _PILColor
+except ImportError:
+    _PILImage = None
+
+# "tk" (the default) draws in real windows; "headless" draws into
+#   HeadlessCanvas objects that need no display
+HEADLESS = os.environ.get("GRAPHICS_BACKEND", "tk").lower() == "headless"
+
 
 ##########################################################################
 # Module Exceptions
@@ -182,8 +215,31 @@ BAD_OPTION = "Illegal option value"
 ##########################################################################
 # global variables and funtions
 
-_root = tk.Tk()
-_root.withdraw()
+_root = None
+
+def getRoot():
+    """Returns the Tk root shared by every window, making it the first
+    time it's needed"""
+    global _root
+    if _root is None:
+        if HEADLESS:
+            raise GraphicsError("no Tk root with the headless backend")
+        _root = tk.Tk()
+        _root.withdraw()
+        #MacOS fix 2
+        #tk.Toplevel(_root).destroy()
+
+        # MacOS fix 1
+        _root.update()
+    return _root
+
+def _flush():
+    # what autoflush does after each change: lets Tk repaint and handle
+    #   events, or runs due timers for the headless backend
+    if HEADLESS:
+        _runHeadlessTimers()
+    elif _root is not None:
+        _root.update()
 
 _update_lasttime = time.time()
 
@@ -198,27 +254,342 @@ def update(rate=None):
         else:
             _update_lasttime = now
 
-    _root.update()
+    _flush()
+
+############################################################################
+# Headless backend: stands in for the Tk canvas, toplevel window and
+#   PhotoImage, recording what's drawn instead of showing it
+
+_headlessTimers = []   # heap of (due time, sequence, function, args)
+_headlessSequence = itertools.count()
+_headlessItemIds = itertools.count(1)
+
+def _runHeadlessTimers(until=None):
+    # runs after() callbacks that are due (or all due by until, sleeping
+    #   until each one's time comes)
+    while _headlessTimers:
+        due = _headlessTimers[0][0]
+        now = time.perf_counter()
+        if due > now:
+            if until is None or due > until:
+                return
+            time.sleep(due - now)
+        due, seq, func, args = heapq.heappop(_headlessTimers)
+        func(*args)
+
+def _color(name, default=None):
+    # Tk color name (or "#rrggbb") to an RGB tuple for PIL
+    if not name:
+        return default
+    try:
+        return _PILColor.getrgb(name.replace(" ", ""))
+    except ValueError:
+        return default
+
+class _HeadlessMaster:
+
+    """Stands in for the Toplevel window a GraphWin lives in"""
+
+    def __init__(self):
+        self._title = ""
+        self.destroyed = False
+
+    def title(self, text=None):
+        if text is None:
+            return self._title
+        self._title = text
+
+    def protocol(self, name, func): pass
+    def resizable(self, width, height): pass
+    def lift(self): pass
+
+    def destroy(self):
+        self.destroyed = True
+
+class _HeadlessVar:
+
+    """Stands in for tk.StringVar"""
+
+    def __init__(self, value=""):
+        self.value = value
+
+    def get(self): return self.value
+    def set(self, value): self.value = value
+
+class _HeadlessPhoto:
+
+    """Stands in for tk.PhotoImage, keeping the pixels in a PIL image (if
+    PIL is installed)"""
+
+    def __init__(self, file=None, width=0, height=0, pil=None):
+        if pil is None and _PILImage is not None:
+            if file is not None:
+                with _PILImage.open(file) as img:
+                    pil = img.convert("RGBA")
+            else:
+                pil = _PILImage.new("RGBA", (width, height), (0, 0, 0, 0))
+        elif pil is None and file is not None:
+            raise GraphicsError("loading images headless needs PIL")
+        self.pil = pil
+        self._size = pil.size if pil is not None else (width, height)
+
+    def width(self): return self._size[0]
+    def height(self): return self._size[1]
+
+    def get(self, x, y):
+        return self.pil.getpixel((x, y))[:3]
+
+    def put(self, data, to):
+        # graphics only puts single pixels: "{color}" at (x, y)
+        self.pil.putpixel(to, _color(data.strip("{}"), (0, 0, 0)) + (255,))
+
+    def copy(self):
+        if self.pil is None:
+            return _HeadlessPhoto(width=self._size[0], height=self._size[1])
+        return _HeadlessPhoto(pil=self.pil.copy())
+
+    def write(self, filename, format=None):
+        self.pil.save(filename, format)
+
+def _PILImageModule():
+    if _PILImage is None:
+        raise GraphicsError("converting to a PIL image needs PIL")
+    return _PILImage
+
+def _newPhotoImage(**options):
+    if HEADLESS:
+        return _HeadlessPhoto(**options)
+    return tk.PhotoImage(master=getRoot(), **options)
+
+def photoFromPIL(pilImage):
+    """Converts a PIL image to a photo image that can be drawn (through an
+    in-memory PNG, no temporary file)"""
+    if HEADLESS:
+        return _HeadlessPhoto(pil=pilImage.convert("RGBA"))
+    buffer = io.BytesIO()
+    pilImage.save(buffer, "PNG")
+    return tk.PhotoImage(master=getRoot(), format="png",
+                         data=base64.b64encode(buffer.getvalue()))
+
+def photoFromFile(filename):
+    """Loads an image file (GIF or PNG) as a photo image that can be drawn"""
+    return _newPhotoImage(file=filename)
+
+def cropPhoto(photo, x, y, width, height):
+    """Copies the width x height region of a photo image with (x, y) as its
+    top left corner into a new photo image"""
+    if HEADLESS:
+        if photo.pil is None:
+            return _HeadlessPhoto(width=width, height=height)
+        return _HeadlessPhoto(pil=photo.pil.crop((x, y, x + width,
+                                                  y + height)))
+    region = tk.PhotoImage(master=getRoot(), width=width, height=height)
+    region.tk.call(region, "copy", photo, "-from", x, y, x + width,
+                   y + height)
+    return region
+
+class _HeadlessButton:
+
+    """Stands in for a tk.Button: keeps its options and where it was placed,
+    and invoke() runs its command like a click would"""
+
+    def __init__(self, master, **options):
+        self.master = master
+        self.options = options
+        self.placement = None
+
+    def __getitem__(self, key): return self.options.get(key)
+    def __setitem__(self, key, value): self.options[key] = value
+    cget = __getitem__
+
+    def config(self, **options): self.options.update(options)
+    configure = config
+
+    def place(self, **options): self.placement = options
+    def destroy(self): pass
+
+    def invoke(self):
+        command = self.options.get("command")
+        if command is not None and self.options.get("state") != "disabled":
+            return command()
+
+def makeButton(master, **options):
+    """Makes a tk.Button on a window (a stand-in that can be clicked with
+    invoke() when the headless backend is used)"""
+    if HEADLESS:
+        return _HeadlessButton(master, **options)
+    return tk.Button(master, **options)
+
+class HeadlessCanvas:
+
+    """An in-memory replacement for tk.Canvas, used as GraphWin's base class
+    with the headless backend. Each canvas item is kept in self.itemsById
+    (id -> dict with "type", "coords" and "options") and every call that
+    changes the canvas is appended to self.operations, so drawing code can
+    be tested and benchmarked without a display."""
+
+    def __init__(self, master, width=200, height=200, **options):
+        self.master = master
+        self.canvasWidth = int(width)
+        self.canvasHeight = int(height)
+        self.background = "white"
+        self.itemsById = {}
+        self.operations = []
+
+    # widget methods GraphWin uses
+    def pack(self, **options): pass
+    def bind(self, sequence, func): pass
+    def bind_all(self, sequence, func): pass
+    def update(self): _runHeadlessTimers()
+    def update_idletasks(self): pass
+    def quit(self): del _headlessTimers[:]
+
+    def config(self, **options):
+        if "bg" in options:
+            self.background = options["bg"]
+    configure = config
+
+    def after(self, ms, func=None, *args):
+        if func is None:
+            time.sleep(ms / 1000)
+            return None
+        entry = (time.perf_counter() + ms / 1000, next(_headlessSequence),
+                 func, args)
+        heapq.heappush(_headlessTimers, entry)
+        return entry[1]
+
+    def after_idle(self, func, *args):
+        return self.after(0, func, *args)
+
+    def after_cancel(self, timerId):
+        _headlessTimers[:] = [x for x in _headlessTimers if x[1] != timerId]
+        heapq.heapify(_headlessTimers)
+
+    def mainloop(self):
+        """Runs after() callbacks in time order until there are none left"""
+        _runHeadlessTimers(until=float("inf"))
+
+    # canvas items
+    def _create(self, kind, args, options):
+        coords = []
+        cnf = {}
+        for arg in args:
+            if isinstance(arg, dict):
+                cnf.update(arg)
+            else:
+                coords.append(arg)
+        cnf.update(options)
+        itemId = next(_headlessItemIds)
+        self.itemsById[itemId] = {"type": kind, "coords": coords,
+                                  "options": cnf}
+        self.operations.append(("create", kind, itemId))
+        return itemId
+
+    def create_rectangle(self, *args, **options):
+        return self._create("rectangle", args, options)
+
+    def create_oval(self, *args, **options):
+        return self._create("oval", args, options)
+
+    def create_line(self, *args, **options):
+        return self._create("line", args, options)
+
+    def create_polygon(self, *args, **options):
+        return self._create("polygon", args, options)
+
+    def create_text(self, *args, **options):
+        return self._create("text", args, options)
+
+    def create_image(self, *args, **options):
+        return self._create("image", args, options)
+
+    def create_window(self, *args, **options):
+        return self._create("window", args, options)
+
+    def delete(self, itemId):
+        self.itemsById.pop(itemId, None)
+        self.operations.append(("delete", itemId))
+
+    def move(self, itemId, dx, dy):
+        item = self.itemsById[itemId]
+        item["coords"] = [c + (dy if i % 2 else dx)
+                          for i, c in enumerate(item["coords"])]
+        self.operations.append(("move", itemId))
+
+    def coords(self, itemId, *coords):
+        if coords:
+            self.itemsById[itemId]["coords"] = list(coords)
+            self.operations.append(("coords", itemId))
+        return list(self.itemsById[itemId]["coords"])
+
+    def tag_raise(self, itemId):
+        item = self.itemsById.pop(itemId)
+        self.itemsById[itemId] = item
+
+    def itemconfig(self, itemId, cnf=None, **options):
+        item = self.itemsById[itemId]
+        item["options"].update(cnf or {})
+        item["options"].update(options)
+        self.operations.append(("itemconfig", itemId))
+    itemconfigure = itemconfig
+
+    def rasterize(self):
+        """Draws the canvas items into a PIL image (RGB), in drawing order"""
+        if _PILImage is None:
+            raise GraphicsError("rasterizing needs PIL")
+        image = _PILImage.new("RGB", (self.canvasWidth, self.canvasHeight),
+                              _color(self.background, (255, 255, 255)))
+        draw = _PILDraw.Draw(image)
+        for item in self.itemsById.values():
+            kind = item["type"]
+            coords = item["coords"]
+            options = item["options"]
+            fill = _color(options.get("fill"))
+            outline = _color(options.get("outline"))
+            width = int(float(options.get("width", 1)))
+            if kind in ("rectangle", "oval"):
+                x1, y1, x2, y2 = coords
+                box = [min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)]
+                shape = draw.rectangle if kind == "rectangle" else \
+                    draw.ellipse
+                shape(box, fill=fill, outline=outline, width=width)
+            elif kind == "line":
+                draw.line(coords, fill=fill or (0, 0, 0), width=width)
+            elif kind == "polygon":
+                draw.polygon(coords, fill=fill, outline=outline)
+            elif kind == "text":
+                anchor = "la" if options.get("anchor") == "nw" else "mm"
+                draw.text(coords[:2], str(options.get("text", "")),
+                          fill=fill or (0, 0, 0), anchor=anchor)
+            elif kind == "image":
+                photo = options.get("image")
+                if getattr(photo, "pil", None) is not None:
+                    x = int(coords[0] - photo.width() / 2)
+                    y = int(coords[1] - photo.height() / 2)
+                    image.paste(photo.pil, (x, y), photo.pil)
+        return image
+
+_CanvasBase = HeadlessCanvas if HEADLESS else tk.Canvas
 
 ############################################################################
 # Graphics classes start here
 
-class GraphWin(tk.Canvas):
+class GraphWin(_CanvasBase):
 
     """A GraphWin is a toplevel window for displaying graphics."""
 
     def __init__(self, title="Graphics Window",
                  width=200, height=200, autoflush=True):
         assert type(title) == type(""), "Title must be a string"
-        master = tk.Toplevel(_root)
+        master = _HeadlessMaster() if HEADLESS else tk.Toplevel(getRoot())
         master.protocol("WM_DELETE_WINDOW", self.close)
-        tk.Canvas.__init__(self, master, width=width, height=height,
+        _CanvasBase.__init__(self, master, width=width, height=height,
                            highlightthickness=0, bd=0)
         self.master.title(title)
         self.pack()
         master.resizable(0,0)
         self.foreground = "black"
-        self.items = []
+        self.items = {}  # drawn objects in drawing order (values unused)
         self.mouseX = None
         self.mouseY = None
         self.bind("<Button-1>", self._onClick)
@@ -226,12 +597,15 @@ class GraphWin(tk.Canvas):
         self.height = int(height)
         self.width = int(width)
         self.autoflush = autoflush
+        self._batchDepth = 0
+        self.metrics = None
+        self._overlayId = None
         self._mouseCallback = None
         self.trans = None
         self.closed = False
         master.lift()
         self.lastKey = ""
-        if autoflush: _root.update()
+        if autoflush: _flush()
 
     def __repr__(self):
         if self.isClosed():
@@ -283,7 +657,56 @@ class GraphWin(tk.Canvas):
 
     def __autoflush(self):
         if self.autoflush:
-            _root.update()
+            _flush()
+
+    def _changed(self, kind):
+        # called by GraphicsObjects after they change the canvas; kind is
+        #   "draw", "undraw", "move" or "reconfig"
+        if self.metrics is not None:
+            self.metrics.counts[kind] += 1
+        if self.autoflush:
+            self._timedFlush(time.perf_counter())
+
+    def _timedFlush(self, frameStart):
+        # an autoflush update, timed when metrics are on; frameStart is when
+        #   the changes being shown started (the start of a batch)
+        metrics = self.metrics
+        if metrics is None:
+            _flush()
+            return
+        if self._overlayId is not None and not self.closed:
+            metrics.showOverlay(self, self._overlayId)
+        start = time.perf_counter()
+        _flush()
+        end = time.perf_counter()
+        metrics.countFlush(end - start)
+        metrics.countFrame(end, end - frameStart)
+
+    def enableMetrics(self, overlay=False):
+        """Start counting drawing calls and timing updates in this window.
+        With overlay=True the numbers are also shown in the top left
+        corner. Returns the RenderMetrics object."""
+        self.metrics = RenderMetrics()
+        if overlay and self._overlayId is None:
+            # drawn straight on the canvas so it isn't one of the window's
+            #   items (and isn't counted)
+            self._overlayId = self.create_text(4, 4, anchor="nw", text="",
+                                               fill="red",
+                                               font=("courier", 9, "normal"))
+        return self.metrics
+
+    def disableMetrics(self):
+        self.metrics = None
+        if self._overlayId is not None and not self.closed:
+            self.delete(self._overlayId)
+        self._overlayId = None
+
+    def getMetrics(self):
+        """Returns the window's metrics as a dict (see RenderMetrics.report),
+        or None if they aren't enabled"""
+        if self.metrics is None:
+            return None
+        return self.metrics.report()
 
 
     def plot(self, x, y, color="black"):
@@ -305,9 +728,32 @@ class GraphWin(tk.Canvas):
         self.__checkOpen()
         self.update_idletasks()
 
+    @contextmanager
+    def batch(self):
+        """Context manager that groups drawing into a single update:
+        objects drawn, undrawn, moved or reconfigured inside the with
+        block don't update the window one by one (as they do when
+        autoflush is on), it's updated once when the block ends.
+        Batches can be nested; only the outermost one updates."""
+        if self._batchDepth == 0:
+            self._batchAutoflush = self.autoflush
+            self._batchStart = time.perf_counter()
+            self.autoflush = False
+        self._batchDepth += 1
+        try:
+            yield self
+        finally:
+            self._batchDepth -= 1
+            if self._batchDepth == 0:
+                self.autoflush = self._batchAutoflush
+                if self.autoflush:
+                    # the whole batch counts as one frame
+                    self._timedFlush(self._batchStart)
+
     def getMouse(self):
         """Wait for mouse click and return Point object representing
         the click"""
+        if HEADLESS: raise GraphicsError("getMouse needs a display")
         self.update()      # flush any prior clicks
         self.mouseX = None
         self.mouseY = None
@@ -336,6 +782,7 @@ class GraphWin(tk.Canvas):
 
     def getKey(self):
         """Wait for user to press a key and return it as a string."""
+        if HEADLESS: raise GraphicsError("getKey needs a display")
         self.lastKey = ""
         while self.lastKey == "":
             self.update()
@@ -387,18 +834,81 @@ class GraphWin(tk.Canvas):
             self._mouseCallback(Point(e.x, e.y))
 
     def addItem(self, item):
-        self.items.append(item)
+        self.items[item] = None
 
     def delItem(self, item):
-        self.items.remove(item)
+        del self.items[item]
 
     def redraw(self):
-        for item in self.items[:]:
+        for item in list(self.items):
             item.undraw()
             item.draw(self)
         self.update()
 
 
+class RenderMetrics:
+
+    """Drawing counters and update timings for one GraphWin. A frame is one
+    update of the window: a whole batch() block, or a single change made
+    with autoflush on."""
+
+    OVERLAY_INTERVAL = 0.25  # seconds between overlay refreshes
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.counts = {"draw": 0, "undraw": 0, "move": 0, "reconfig": 0}
+        self.flushes = 0
+        self.flushTime = 0.0
+        self.longestFlush = 0.0
+        self.frames = 0
+        self.longestFrame = 0.0
+        self.recentFrames = collections.deque()  # end times, last second
+        self.lastOverlay = 0.0
+
+    def countFlush(self, seconds):
+        self.flushes += 1
+        self.flushTime += seconds
+        self.longestFlush = max(self.longestFlush, seconds)
+
+    def countFrame(self, end, seconds):
+        self.frames += 1
+        self.longestFrame = max(self.longestFrame, seconds)
+        self.recentFrames.append(end)
+        while self.recentFrames[0] < end - 1.0:
+            self.recentFrames.popleft()
+
+    def fps(self):
+        """Frames in the last second"""
+        now = time.perf_counter()
+        return sum(1 for end in self.recentFrames if end >= now - 1.0)
+
+    def report(self):
+        """Returns the counts and timings (dict; times in seconds)"""
+        report = dict(self.counts)
+        report.update({"flushes": self.flushes, "flushTime": self.flushTime,
+                       "longestFlush": self.longestFlush,
+                       "frames": self.frames, "fps": self.fps(),
+                       "longestFrame": self.longestFrame})
+        return report
+
+    def showOverlay(self, canvas, itemId):
+        # refreshed a few times a second at most, right before an update
+        now = time.perf_counter()
+        if now - self.lastOverlay < self.OVERLAY_INTERVAL:
+            return
+        self.lastOverlay = now
+        text = ("%d fps  longest frame %.1f ms\n"
+                "draw %d  undraw %d  move %d  reconfig %d\n"
+                "%d updates, %.1f ms total") % (
+            self.fps(), self.longestFrame * 1000, self.counts["draw"],
+            self.counts["undraw"], self.counts["move"],
+            self.counts["reconfig"], self.flushes, self.flushTime * 1000)
+        canvas.itemconfig(itemId, text=text)
+        canvas.tag_raise(itemId)
+
+
 class Transform:
 
     """Internal class for 2-D coordinate transformations"""
@@ -483,8 +993,7 @@ class GraphicsObject:
         self.canvas = graphwin
         self.id = self._draw(graphwin, self.config)
         graphwin.addItem(self)
-        if graphwin.autoflush:
-            _root.update()
+        graphwin._changed("draw")
         return self
 
 
@@ -497,8 +1006,7 @@ class GraphicsObject:
         if not self.canvas.isClosed():
             self.canvas.delete(self.id)
             self.canvas.delItem(self)
-            if self.canvas.autoflush:
-                _root.update()
+            self.canvas._changed("undraw")
         self.canvas = None
         self.id = None
 
@@ -519,8 +1027,7 @@ class GraphicsObject:
                 x = dx
                 y = dy
             self.canvas.move(self.id, x, y)
-            if canvas.autoflush:
-                _root.update()
+            canvas._changed("move")
 
     def _reconfig(self, option, setting):
         # Internal method for changing configuration of the object
@@ -532,9 +1039,19 @@ class GraphicsObject:
         options[option] = setting
         if self.canvas and not self.canvas.isClosed():
             self.canvas.itemconfig(self.id, options)
-            if self.canvas.autoflush:
-                _root.update()
+            self.canvas._changed("reconfig")
+
 
+    def _setCoords(self, points):
+        # Internal method for moving a drawn object's canvas item to new
+        #    points (in world coordinates), keeping its Tk id
+        canvas = self.canvas
+        if canvas and not canvas.isClosed():
+            coords = []
+            for p in points:
+                coords.extend(canvas.toScreen(p.x, p.y))
+            canvas.coords(self.id, *coords)
+            canvas._changed("reconfig")
 
     def _draw(self, canvas, options):
         """draws appropriate figure on canvas with options provided
@@ -592,6 +1109,13 @@ class _BBox(GraphicsObject):
 
     def getP2(self): return self.p2.clone()
 
+    def setPoints(self, p1, p2):
+        """Set new corners (endpoints for a Line), reshaping it in place
+        if it's drawn"""
+        self.p1 = p1.clone()
+        self.p2 = p2.clone()
+        self._setCoords([self.p1, self.p2])
+
     def getCenter(self):
         p1 = self.p1
         p2 = self.p2
@@ -708,6 +1232,13 @@ class Polygon(GraphicsObject):
     def getPoints(self):
         return list(map(Point.clone, self.points))
 
+    def setPoints(self, *points):
+        """Set new vertices, reshaping it in place if it's drawn"""
+        if len(points) == 1 and type(points[0]) == type([]):
+            points = points[0]
+        self.points = list(map(Point.clone, points))
+        self._setCoords(self.points)
+
     def _move(self, dx, dy):
         for p in self.points:
             p.move(dx,dy)
@@ -755,6 +1286,11 @@ class Text(GraphicsObject):
     def getAnchor(self):
         return self.anchor.clone()
 
+    def setAnchor(self, p):
+        """Move the text so it's centered on p"""
+        self.anchor = p.clone()
+        self._setCoords([self.anchor])
+
     def setFace(self, face):
         if face in ['helvetica','arial','courier','times roman']:
             f,s,b = self.config['font']
@@ -787,7 +1323,7 @@ class Entry(GraphicsObject):
         self.anchor = p.clone()
         #print self.anchor
         self.width = width
-        self.text = tk.StringVar(_root)
+        self.text = _HeadlessVar() if HEADLESS else tk.StringVar(getRoot())
         self.text.set("")
         self.fill = "gray"
         self.color = "black"
@@ -800,6 +1336,8 @@ class Entry(GraphicsObject):
     def _draw(self, canvas, options):
         p = self.anchor
         x,y = canvas.toScreen(p.x,p.y)
+        if HEADLESS:
+            return canvas.create_window(x,y,text=self.text.get())
         frm = tk.Frame(canvas.master)
         self.entry = tk.Entry(frm,
                               width=self.width,
@@ -824,7 +1362,7 @@ class Entry(GraphicsObject):
     def clone(self):
         other = Entry(self.anchor, self.width)
         other.config = self.config.copy()
-        other.text = tk.StringVar()
+        other.text = _HeadlessVar() if HEADLESS else tk.StringVar(getRoot())
         other.text.set(self.text.get())
         other.fill = self.fill
         return other
@@ -881,11 +1419,16 @@ class Image(GraphicsObject):
         self.anchor = p.clone()
         self.imageId = Image.idCount
         Image.idCount = Image.idCount + 1
-        if len(pixmap) == 1: # file name provided
-            self.img = tk.PhotoImage(file=pixmap[0], master=_root)
+        if len(pixmap) == 1 and isinstance(pixmap[0], (str, os.PathLike)):
+            # file name provided (a str or e.g. a pathlib.Path)
+            self.img = _newPhotoImage(file=os.fspath(pixmap[0]))
+        elif len(pixmap) == 1:
+            # an image that's already loaded (tk.PhotoImage or
+            # PIL.ImageTk.PhotoImage), e.g. cropped from a sprite sheet
+            self.img = pixmap[0]
         else: # width and height provided
             width, height = pixmap
-            self.img = tk.PhotoImage(master=_root, width=width, height=height)
+            self.img = _newPhotoImage(width=width, height=height)
 
     def __repr__(self):
         return "Image({}, {}, {})".format(self.anchor, self.getWidth(), self.getHeight())
@@ -909,6 +1452,21 @@ class Image(GraphicsObject):
     def getAnchor(self):
         return self.anchor.clone()
 
+    def setAnchor(self, p):
+        """Move the image so it's centered on p"""
+        self.anchor = p.clone()
+        self._setCoords([self.anchor])
+
+    def setImage(self, img):
+        """Show another Tk image (e.g. the next animation frame) in place
+        of this one, keeping the same canvas item if it's drawn"""
+        self.img = img
+        canvas = self.canvas
+        if canvas and not canvas.isClosed():
+            self.imageCache[self.imageId] = img
+            canvas.itemconfig(self.id, image=img)
+            canvas._changed("reconfig")
+
     def clone(self):
         other = Image(Point(0,0), 0, 0)
         other.img = self.img.copy()
@@ -944,6 +1502,97 @@ class Image(GraphicsObject):
         """
         self.img.put("{" + color +"}", (x, y))
 
+    def _photoCall(self, *args):
+        # runs a Tk photo image command on the image (works for
+        #   PIL.ImageTk.PhotoImage too, which has no put/get of its own)
+        return getRoot().tk.call(str(self.img), *args)
+
+    def _region(self, x, y, width, height):
+        if width is None: width = self.getWidth() - x
+        if height is None: height = self.getHeight() - y
+        return width, height
+
+    def getPixels(self, x=0, y=0, width=None, height=None):
+        """Returns the RGB values of a rectangle of pixels as bytes, 3 per
+        pixel, row by row (the whole image by default). The pixels are
+        read with one call into Tk instead of one per pixel."""
+        width, height = self._region(x, y, width, height)
+        if HEADLESS:
+            region = self.img.pil.crop((x, y, x + width, y + height))
+            return region.convert("RGB").tobytes()
+        data = self._photoCall("data", "-from", x, y, x + width, y + height)
+        hexDigits = []
+        for row in getRoot().tk.splitlist(data):
+            if not isinstance(row, str):
+                row = " ".join(row)
+            hexDigits.append(row.replace("#", "").replace(" ", ""))
+        return bytes.fromhex("".join(hexDigits))
+
+    def getPixelArray(self, x=0, y=0, width=None, height=None):
+        """Like getPixels, but returns a NumPy array of shape
+        (height, width, 3) (needs NumPy)"""
+        import numpy
+        width, height = self._region(x, y, width, height)
+        pixels = numpy.frombuffer(self.getPixels(x, y, width, height),
+                                  dtype=numpy.uint8)
+        return pixels.reshape(height, width, 3)
+
+    def setPixels(self, data, x=0, y=0, width=None):
+        """Writes a rectangle of pixels with (x,y) as its top left corner,
+        in one call into Tk. data is either bytes of RGB values, 3 per
+        pixel row by row, width pixels to a row (the image's width by
+        default), or a NumPy array of shape (height, width, 3), (height,
+        width, 4) (alpha is ignored) or (height, width) (gray). Array
+        values outside 0-255 are clamped."""
+        if hasattr(data, "shape"):
+            # NumPy array
+            height, width = data.shape[0], data.shape[1]
+            import numpy
+            channels = data.shape[2] if len(data.shape) == 3 else 1
+            # clamped, since casting would wrap 300 around to 44
+            data = numpy.clip(data, 0, 255).astype(numpy.uint8).tobytes()
+        else:
+            channels = 3
+            if width is None: width = self.getWidth() - x
+            height = len(data) // (width * channels)
+        if width == 0 or height == 0:
+            return
+
+        if HEADLESS:
+            mode = {1: "L", 3: "RGB", 4: "RGBA"}[channels]
+            region = _PILImage.frombytes(mode, (width, height), data)
+            # alpha is dropped like Tk's put does, so pasted pixels are
+            #   opaque
+            self.img.pil.paste(region.convert("RGB"), (x, y))
+            return
+
+        hexData = bytes(data).hex()
+        step = channels * 2
+        if channels == 1:
+            colors = ["#" + hexData[i:i + 2] * 3
+                      for i in range(0, len(hexData), step)]
+        else:
+            colors = ["#" + hexData[i:i + 6]
+                      for i in range(0, len(hexData), step)]
+        rows = ["{" + " ".join(colors[r * width:(r + 1) * width]) + "}"
+                for r in range(height)]
+        self._photoCall("put", " ".join(rows), "-to", x, y)
+
+    def toPIL(self):
+        """Returns a copy of the image as a PIL image (RGBA), converted in
+        memory"""
+        if HEADLESS:
+            return self.img.pil.copy()
+        data = self._photoCall("data", "-format", "png")
+        with _PILImageModule().open(io.BytesIO(base64.b64decode(data))) \
+                as pilImage:
+            return pilImage.convert("RGBA")
+
+    @classmethod
+    def fromPIL(cls, p, pilImage):
+        """Makes an Image centered on p from a PIL image, without a
+        temporary file"""
+        return cls(p, photoFromPIL(pilImage))
 
     def save(self, filename):
         """Saves the pixmap image to filename.
@@ -1005,11 +1654,5 @@ def test():
     win.getMouse()
     win.close()
 
-#MacOS fix 2
-#tk.Toplevel(_root).destroy()
-
-# MacOS fix 1
-update()
-
 if __name__ == "__main__":
     test()
@@ -1,7 +1,6 @@
-from graphics import *
+from typeChart import typeId
 from random import randrange, choice
 import json
-import requests
 
 """
     Damage Calculator API: https://www.smogon.com/forums/threads/damage-calculator-api.3599759/
@@ -28,6 +27,8 @@ def readPokeFile(filename):
             currentPokemon[header[i]] = lineList[i]
         currentPokemon['Moves'] = [x.strip()[1:-1] for x in currentPokemon['Moves'][1:-1].split(',')]
         currentPokemon['Abilities'] = [x.strip()[1:-1] for x in currentPokemon['Abilities'][1:-1].split(',')]
+        currentPokemon['Types'] = [x.strip()[1:-1] for x in currentPokemon['Types'][1:-1].split(',')]
+        currentPokemon['TypeIds'] = tuple(typeId(x) for x in currentPokemon['Types'])
         pokemonData.append(currentPokemon)
     infile.close()
     return pokemonData
@@ -45,8 +46,37 @@ def readMoveFile():
         name = lineList[1]
         moveType = lineList[2]
         Move2Animation[name] = moveType
+    infile.close()
     return Move2Animation
 
+def parseMoveNumber(value):
+    """Power, Accuracy and PP columns use 'None' for moves without a value"""
+    if value == "None":
+        return None
+    return int(value)
+
+def readMoveDetails(filename="move-data.csv"):
+    """Index; Name; Types; Category; Contest; PP; Power; Accuracy; Generation
+    Returns a dict of move name to the columns the damage calculator needs"""
+    infile = open(filename, "r")
+
+    moveDetails = {}
+    for line in infile:
+        if line.startswith('Index,Name,'):
+            continue
+        line = line.strip()
+        lineList = line.split(",")
+        moveDetails[lineList[1]] = {
+            "Type": lineList[2],
+            "TypeId": typeId(lineList[2]),
+            "Category": lineList[3],
+            "PP": parseMoveNumber(lineList[5]),
+            "Power": parseMoveNumber(lineList[6]),
+            "Accuracy": parseMoveNumber(lineList[7]),
+        }
+    infile.close()
+    return moveDetails
+
 
 if __name__ == '__main__':
     pokemonData = readPokeFile("pokemon-data.csv")
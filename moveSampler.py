@@ -0,0 +1,80 @@
+import numpy as np
+
+"""
+    Description: Draws random 4-move sets in bulk for simulations. Each
+                 species' compiled movepool (unique move IDs) is sampled
+                 without replacement with Floyd's algorithm, done with numpy
+                 across every set at once, so a million sets take a few array
+                 operations instead of a million calls to getMoves.
+"""
+
+MOVES_PER_SET = 4
+
+
+class MoveSetSampler:
+
+    """Random move sets for every species in a roster"""
+
+    def __init__(self, pokemonRecords):
+        """
+            Parameters: pokemonRecords- the roster, in ID order (list of
+                        PokemonRecord objects)
+        """
+        self.movepools = [np.frombuffer(pokemon.moveIds, dtype=np.uint16)
+                          if len(pokemon.moveIds) else
+                          np.zeros(0, dtype=np.uint16)
+                          for pokemon in pokemonRecords]
+
+    @classmethod
+    def fromColumns(cls, columns):
+        """
+            Description: Makes a sampler over the CSR movepools of columnar
+                         data; each movepool is a view into one array
+            Parameters: columns- the roster as columns (columnar.ColumnarData)
+            Return Val: the sampler (MoveSetSampler object)
+        """
+        sampler = cls([])
+        sampler.movepools = [columns.movepool(speciesId)
+                             for speciesId in range(len(columns.species))]
+        return sampler
+
+    def sample(self, speciesId, count, rng=None):
+        """
+            Description: Draws move sets for one species. Every set of four
+                         different moves is equally likely; a species with
+                         fewer than four moves gets all of them in each set.
+            Parameters: speciesId- the species' ID (int),
+                        count- number of sets (int),
+                        rng- random generator (numpy.random.Generator)
+            Return Val: move IDs, one set per row (numpy array of shape
+                        (count, min(4, movepool size)))
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        movepool = self.movepools[speciesId]
+        size = len(movepool)
+        picks = min(MOVES_PER_SET, size)
+
+        # Floyd's algorithm: for j = size-picks .. size-1 draw t from 0..j
+        # and take t, or j if t was already taken
+        chosen = np.empty((count, picks), dtype=np.int64)
+        for step, j in enumerate(range(size - picks, size)):
+            t = rng.integers(0, j + 1, size=count)
+            taken = (chosen[:, :step] == t[:, None]).any(axis=1)
+            chosen[:, step] = np.where(taken, j, t)
+
+        # Floyd's picks come out in a biased order, so shuffle each row
+        chosen = rng.permuted(chosen, axis=1)
+        return movepool[chosen]
+
+    def sampleAll(self, count, rng=None):
+        """
+            Description: Draws move sets for every species
+            Parameters: count- sets per species (int),
+                        rng- random generator (numpy.random.Generator)
+            Return Val: each species' sets, in ID order (list of numpy array)
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        return [self.sample(speciesId, count, rng)
+                for speciesId in range(len(self.movepools))]
@@ -0,0 +1,84 @@
+from array import array
+import sys
+
+"""
+    Description: Compiles the movepools in pokemon-data.csv into arrays of
+                 unique move IDs. The raw movepools repeat moves (Arcanine
+                 lists Flame Wheel and Heat Wave many times), and an entry
+                 that isn't a move in move-data.csv (a typo or an empty name)
+                 can't be used; compiling drops both, so every move in a
+                 movepool is equally likely to be picked. Dropped entries
+                 should be fixed in the data file.
+
+    Usage: python movepool.py lists the movepools with unknown moves, or
+           fewer than four moves, and counts the repeats that were merged
+"""
+
+
+def compileMovepool(names, moveIdsByName):
+    """
+        Description: Turns a movepool's move names into unique move IDs
+        Parameters: names- the movepool as listed in the data file (list of
+                    str),
+                    moveIdsByName- move name to move ID (dict)
+        Return Val: (the unique move IDs in the order first listed (array of
+                    unsigned short), the names that aren't known moves (list
+                    of str))
+    """
+    moveIds = array("H")
+    seen = set()
+    unknown = []
+    for name in names:
+        moveId = moveIdsByName.get(name)
+        if moveId is None:
+            unknown.append(name)
+        elif moveId not in seen:
+            seen.add(moveId)
+            moveIds.append(moveId)
+    return moveIds, unknown
+
+
+def checkMovepools(pokemonData, moveRecords):
+    """
+        Description: Finds problems in the raw movepools. Repeated moves
+                     aren't a problem (compiling merges them), so they're
+                     only counted.
+        Parameters: pokemonData- from move.readPokeFile (list of dict),
+                    moveRecords- every move, in ID order (list of MoveRecord)
+        Return Val: (one entry per species with a problem (list of dict with
+                    "Name", "Unknown" (names that aren't known moves) and
+                    "Unique" (moves left)), repeated entries merged across
+                    every movepool (int))
+    """
+    moveIdsByName = {move.name: move.id for move in moveRecords}
+    problems = []
+    duplicates = 0
+    for pokemon in pokemonData:
+        moveIds, unknown = compileMovepool(pokemon["Moves"], moveIdsByName)
+        duplicates += len(pokemon["Moves"]) - len(unknown) - len(moveIds)
+        if unknown or len(moveIds) < 4:
+            problems.append({"Name": pokemon["Name"], "Unknown": unknown,
+                             "Unique": len(moveIds)})
+    return problems, duplicates
+
+
+def main():
+    from move import readPokeFile
+    from records import readMoveRecords
+
+    filename = sys.argv[1] if len(sys.argv) > 1 else "pokemon-data.csv"
+    problems, duplicates = checkMovepools(readPokeFile(filename),
+                                          readMoveRecords())
+    for problem in problems:
+        line = "%s: %d unique moves" % (problem["Name"], problem["Unique"])
+        if problem["Unique"] < 4:
+            line += " (fewer than four!)"
+        if problem["Unknown"]:
+            line += ", unknown moves %s" % problem["Unknown"]
+        print(line)
+    print("%d movepools with problems, %d repeated moves merged" %
+          (len(problems), duplicates))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+from bisect import bisect_left, bisect_right
+
+"""
+    Description: Indexes over the Pokemon and move records, built once at
+                 load time so lookups like "every UU Water type" or "every
+                 species that learns Earthquake" are dict lookups instead of
+                 scans over the whole roster.
+
+    Usage: pokedex = Pokedex(pokemonRecords)
+           pokedex.find(typeName="Water", tier="UU")
+           movedex = Movedex(moveRecords)
+           movedex.find(typeName="Fire", category="Physical", minPower=80)
+"""
+
+
+def addToIndex(index, key, record):
+    index.setdefault(key, []).append(record)
+
+
+def freezeIndex(index):
+    # tuples so callers can't change the index by editing what they get back
+    return {key: tuple(records) for key, records in index.items()}
+
+
+class Pokedex:
+
+    """Species looked up by name, type, tier and the moves they learn"""
+
+    def __init__(self, pokemonRecords):
+        """
+            Parameters: pokemonRecords- every species, in ID order (list of
+                        PokemonRecord objects)
+        """
+        self.pokemon = tuple(pokemonRecords)
+        self.byName = {}
+        byType = {}
+        byTier = {}
+        byTypeAndTier = {}
+        learners = {}
+        for pokemon in self.pokemon:
+            self.byName[pokemon.name] = pokemon
+            for typeName in pokemon.types:
+                addToIndex(byType, typeName, pokemon)
+                addToIndex(byTypeAndTier, (typeName, pokemon.tier), pokemon)
+            addToIndex(byTier, pokemon.tier, pokemon)
+            for moveId in set(pokemon.moveIds):
+                addToIndex(learners, moveId, pokemon)
+        self.byType = freezeIndex(byType)
+        self.byTier = freezeIndex(byTier)
+        self.byTypeAndTier = freezeIndex(byTypeAndTier)
+        self.learners = freezeIndex(learners)
+
+    def __len__(self):
+        return len(self.pokemon)
+
+    def species(self, name):
+        """Gets a species by name, None if there isn't one"""
+        return self.byName.get(name)
+
+    def ofType(self, typeName):
+        return self.byType.get(typeName, ())
+
+    def inTier(self, tier):
+        return self.byTier.get(tier, ())
+
+    def learnersOf(self, move):
+        """
+            Description: Gets every species that learns a move
+            Parameters: move- the move (MoveRecord object)
+            Return Val: the species, in ID order (tuple of PokemonRecord)
+        """
+        return self.learners.get(move.id, ())
+
+    def find(self, typeName=None, tier=None, move=None):
+        """
+            Description: Gets the species matching every given filter
+            Parameters: typeName- a type the species has (str),
+                        tier- the species' tier (str),
+                        move- a move the species learns (MoveRecord object)
+            Return Val: the species, in ID order (tuple of PokemonRecord)
+        """
+        if typeName is not None and tier is not None:
+            candidates = self.byTypeAndTier.get((typeName, tier), ())
+        elif typeName is not None:
+            candidates = self.ofType(typeName)
+        elif tier is not None:
+            candidates = self.inTier(tier)
+        elif move is not None:
+            return self.learnersOf(move)
+        else:
+            return self.pokemon
+
+        if move is not None:
+            learners = set(self.learnersOf(move))
+            candidates = tuple(x for x in candidates if x in learners)
+        return candidates
+
+
+class Movedex:
+
+    """Moves looked up by name, type, category and power"""
+
+    def __init__(self, moveRecords):
+        """
+            Parameters: moveRecords- every move, in ID order (list of
+                        MoveRecord objects)
+        """
+        self.moves = tuple(moveRecords)
+        self.byName = {}
+        byType = {}
+        byCategory = {}
+        for move in self.moves:
+            self.byName[move.name] = move
+            addToIndex(byType, move.type, move)
+            addToIndex(byCategory, move.category, move)
+        self.byType = freezeIndex(byType)
+        self.byCategory = freezeIndex(byCategory)
+
+        # moves with a set power, sorted by it, for range queries with bisect
+        powered = sorted((move for move in self.moves
+                          if move.power is not None),
+                         key=lambda move: (move.power, move.id))
+        self.byPower = tuple(powered)
+        self.powers = [move.power for move in powered]
+
+    def __len__(self):
+        return len(self.moves)
+
+    def move(self, name):
+        """Gets a move by name, None if there isn't one"""
+        return self.byName.get(name)
+
+    def ofType(self, typeName):
+        return self.byType.get(typeName, ())
+
+    def inCategory(self, category):
+        return self.byCategory.get(category, ())
+
+    def inPowerRange(self, minPower=None, maxPower=None):
+        """
+            Description: Gets the moves with a power in a range. Moves with no
+                         set power (status moves, Gyro Ball, ...) are never
+                         included.
+            Parameters: minPower, maxPower- inclusive bounds, None for no
+                        bound (int)
+            Return Val: the moves, weakest first (tuple of MoveRecord)
+        """
+        low = 0 if minPower is None else bisect_left(self.powers, minPower)
+        high = len(self.powers) if maxPower is None else \
+            bisect_right(self.powers, maxPower)
+        return self.byPower[low:high]
+
+    def find(self, typeName=None, category=None, minPower=None,
+             maxPower=None):
+        """
+            Description: Gets the moves matching every given filter
+            Parameters: typeName- the move's type (str),
+                        category- "Physical", "Special" or "Status" (str),
+                        minPower, maxPower- inclusive power bounds (int)
+            Return Val: the moves, in ID order (tuple of MoveRecord)
+        """
+        candidates = None
+        for matches in [
+                None if typeName is None else self.ofType(typeName),
+                None if category is None else self.inCategory(category),
+                None if minPower is None and maxPower is None else
+                self.inPowerRange(minPower, maxPower)]:
+            if matches is None:
+                continue
+            if candidates is None:
+                candidates = set(matches)
+            else:
+                candidates &= set(matches)
+        if candidates is None:
+            return self.moves
+        return tuple(sorted(candidates, key=lambda move: move.id))
@@ -1,95 +1,135 @@
 from graphics import *
 from tkinter.messagebox import showinfo
-from move import readPokeFile, readMoveFile
-from resizeImageZelle import resizeAndDisplayImage
-from time import sleep
+from dataCache import loadDatasets
+from resizeImageZelle import SpriteAtlas, SpriteCache, AnimationSheets
+from animationSheets import readAnimationIndex, SHEET_DIR
+from spriteAtlas import (readAtlasIndex, ATLAS_IMAGE, SPRITE_WIDTH,
+                         SPRITE_HEIGHT)
+from damageCalc import (localDamageRange, remoteDamageRange, damageRangeBatch,
+                        rollDamage)
+from calcClient import DamageCalcError
+from battleEngine import Battle, PLAYER, COMPUTER
+from pokedex import Pokedex, Movedex
+from damageCache import DamageCache
+from turnPipeline import (runInBackground, FrameScheduler, Tween, INSTANT,
+                          StallMonitor)
 import random
-import requests
 
-def calculateDamage(attackingPokemon, defendingPokemon, moveUsed):
-    """
-        Description: Calculates damage a Pokemon's move does to another Pokemon
-        Parameters: attackingPokemon- the attacking Pokemon's stats (dict),
-                    defendingPokemon- the defending Pokemon's stats (dict),
-                    moveUsed- the move used (str)
-        Return Value: damage the move deals to the opposing Pokemon (int)
-
-        Damage Calculator API: https://www.smogon.com/forums/threads/damage-calculator-api.3599759/
-        Damage Calculator GitHub: https://github.com/smogon/damage-calc
-        Damage Calculator Web App: https://calc.pokemonshowdown.com/
-    """
-
-    # POST method API request -- need to convert to python syntax
-    url = 'https://calc-api.herokuapp.com/calc-api'
-
-    # Both attacker and defender object should look something like this:
-    attackerPokemonStats = {
-        # species name AS IT IS IN THE POKEDEX [REQUIRED]
-        "species": attackingPokemon["Name"],
-
-        # ability [REQUIRED] (Mold Breaker negates abilities)
-        "ability": "Mold Breaker",
-
-        # item [REQUIRED] (Cleanse Tag is practically useless in battle. Items
-        # won't give an advantage to either side)
-        "item": "Cleanse Tag",
-
-        "level": 100,  # level [REQUIRED], must be a number
+try:  # the damage matrix needs numpy
+    from damageMatrix import DamageMatrix
+except ImportError:
+    DamageMatrix = None
 
-        "nature": "Serious",  # not required, defaults to serious
+# set to True to get damage from the online damage calculator API instead of
+# calculating it locally (needs an internet connection)
+USE_DAMAGE_API = False
 
-        # not required, defaults to 0 in all stats. Valid stats are "hp", "atk",
-        # "spa", "def", "spd", "spe"
-        "evs": {},
+# precomputed damage ranges for the whole roster, built in main() (DamageMatrix)
+damageMatrix = None
 
-        "ivs": {}  # not required, defaults to 31 in any stat not specified
-    }
+# damage ranges already worked out by the calculators, set up in main()
+# (DamageCache)
+damageCache = None
 
-    defenderPokemonStats = {
-        # species name AS IT IS IN THE POKEDEX  [REQUIRED]
-        "species": defendingPokemon["Name"],
+# battle sprites ready to draw, set up in main() (SpriteCache)
+spriteCache = None
 
-        # ability [REQUIRED] (Mold Breaker negates abilities)
-        "ability": "Mold Breaker",
+# every move animation's frames, loaded once in main() (AnimationSheets)
+animationSheets = None
 
-        # item [REQUIRED] (Cleanse Tag is practically useless in battle. Items
-        # won't give an advantage to either side)
-        "item": "Cleanse Tag",
+# set to a tier (e.g. "OU") to only battle Pokemon from that tier
+MATCHUP_TIER = None
 
-        "level": 100,  # level [REQUIRED], must be a number
+# the next battle's Pokemon, picked a battle ahead so their sprites can be
+# warmed up in spriteCache while the current one is played (tuple)
+nextMatchup = None
 
-        "nature": "Serious",  # not required, defaults to serious
+# how fast battle animations play: 1 is normal, 2 twice as fast
+ANIMATION_SPEED = 1
 
-        # not required, defaults to 0 in all stats. Valid stats are "hp", "atk",
-        # "spa", "def", "spd", "spe"
-        "evs": {},
+# set to True to skip battle animations and messages (plays at INSTANT speed)
+SKIP_ANIMATIONS = False
 
-        "ivs": {}  # not required, defaults to 31 in any stat not specified
-    }
+# how long an HP bar takes to drop, however much damage was done (seconds)
+HP_DROP_SECONDS = 1.0
 
-    battleObject = {
-        "attacker": attackerPokemonStats,
-        "defender": defenderPokemonStats,
-        "move": moveUsed
-    }
+# set to True to print the longest time the event loop was blocked each turn
+MEASURE_STALLS = False
 
-    # The response comes in two parts. The first is data, which will be in an
-    # object like this:
-    response = requests.post(url, json=battleObject)
+# set to True to show drawing counts, update timings and FPS in the corner
+# of the battle window, and print them after each turn
+SHOW_RENDER_METRICS = False
 
-    # Print the content of the response (the data the server returned)
-    battleData = response.json()
-
-    # gets min damage from battle data; uses 0 if not there (defending Pokemon
-    # immune to move)
-    minDamage = battleData.get("min", 0)
+def calculateDamageRange(attackingPokemon, defendingPokemon, move):
+    """
+        Description: Gets the min/max damage a Pokemon's move does to another
+                     Pokemon
+        Parameters: attackingPokemon- the attacking Pokemon (PokemonRecord),
+                    defendingPokemon- the defending Pokemon (PokemonRecord),
+                    move- the move used (MoveRecord object)
+        Return Value: the damage range (dict with "min" and "max", both left
+                      out if the defending Pokemon is immune to the move)
+
+        The damage range is looked up in damageMatrix when it has been built,
+        otherwise it's worked out locally by damageCalc. If USE_DAMAGE_API is
+        set, the Smogon damage calculator API is used instead. Calculated
+        ranges go through damageCache so repeated matchups aren't redone.
+    """
+    battleData = None
+    if damageMatrix is not None and not USE_DAMAGE_API:
+        battleData = damageMatrix.lookup(attackingPokemon, defendingPokemon,
+                                         move)
+    if battleData is None:
+        if USE_DAMAGE_API:
+            calculate = remoteDamageRange
+        else:
+            calculate = localDamageRange
+        if damageCache is None:
+            battleData = calculate(attackingPokemon, defendingPokemon, move)
+        else:
+            # only API results are worth a write to disk
+            battleData = damageCache.getOrCalculate(attackingPokemon,
+                                                    defendingPokemon,
+                                                    move, calculate,
+                                                    persist=USE_DAMAGE_API)
+    return battleData
+
+
+def calculateDamage(attackingPokemon, defendingPokemon, move):
+    """
+        Description: Calculates damage a Pokemon's move does to another Pokemon
+        Parameters: attackingPokemon- the attacking Pokemon (PokemonRecord),
+                    defendingPokemon- the defending Pokemon (PokemonRecord),
+                    move- the move used (MoveRecord object)
+        Return Value: damage the move deals to the opposing Pokemon (int), 0
+                      if it couldn't be calculated
+    """
+    try:
+        battleData = calculateDamageRange(attackingPokemon, defendingPokemon,
+                                          move)
+    except DamageCalcError as error:
+        print("Error! Cannot calculate damage! ", error)
+        battleData = {}
+    return rollDamage(battleData)
 
-    # gets max damage from battle data; uses 0 if not there (defending Pokemon
-    # immune to move)
-    maxDamage = battleData.get("max", 0)
 
-    percentageRoll = int(random.uniform(minDamage, maxDamage))
-    return percentageRoll
+def calculateDamageBatch(triples):
+    """
+        Description: Calculates the damage of several moves at once. With
+                     USE_DAMAGE_API set, the API requests are sent concurrently
+                     instead of one after another.
+        Parameters: triples- (attackingPokemon, defendingPokemon, move) for
+                    each move (list of tuples)
+        Return Value: damage each move deals, in the same order (list of int).
+                      A move whose damage couldn't be calculated does 0.
+    """
+    damageRolls = []
+    for battleData in damageRangeBatch(triples, calculateDamageRange):
+        if "error" in battleData:
+            print("Error! Cannot calculate damage! ", battleData["error"])
+            battleData = {}
+        damageRolls.append(rollDamage(battleData))
+    return damageRolls
 
 
 def displayImage(gw):
@@ -101,8 +141,9 @@ def displayImage(gw):
     width = gw.getWidth()
     height = gw.getHeight()
 
-    for item in gw.items[:]:
-        item.undraw()
+    with gw.batch():
+        for item in list(gw.items):
+            item.undraw()
     gw.update()
 
     pokeImg = Image(Point(width / 2, height / 2), "pokelogo.gif")
@@ -142,56 +183,65 @@ def popupTutorial():
     text = Text(Point(375, 250), tutorialMessage)
     text.draw(gw)
 
-    button = tk.Button(gw, text="Exit", command=gw.close)
+    button = makeButton(gw, text="Exit", command=gw.close)
     button.place(x=375, y=height - 75)
 
 
-def findFrames(animation):
-    """
-        Description: Gets the specific frames needed for the animation
-        Parameters: animation (string) of the specific type (ie. grass, fire)
-        Return Val: Frames (list of filenames) corresponding to the animation
-    """
-    folder = "frames"
-    frames = []
-    for i in range(1, 100):
-        filename = os.path.join(folder, animation + "frame" + str(i) + ".gif")
-        if not os.path.exists(filename):
-            break
-        frames.append(filename)
-    return frames
-
-
-def animateMove(window, moveUsed, move2Animation):
+def animateMove(window, moveUsed, movedex):
     """
         Description: To display the gif images while moving it to the right
         Parameters: window- Graphics Window (GraphWin object),
                     moveUsed- move the user chose (str)
-                    move2Animation- move to animation database (dict)
+                    movedex- every move, looked up by name to pick its
+                    animation (Movedex object)
 
-        Return Value: None
+        Return Value: steps to run with a FrameScheduler (generator)
     """
-    methodName = move2Animation.get(moveUsed)
-    if methodName is None:
+    move = movedex.move(moveUsed)
+    if move is None:
         print("Error! Cannot find move! ", moveUsed)
         return
+    methodName = move.type
 
-    frames = findFrames(methodName.lower())
+    frames = animationSheets.getFrames(methodName.lower())
     if len(frames) == 0:
-        frames = findFrames("normal")
+        frames = animationSheets.getFrames("normal")
+    if len(frames) < 2:
+        # no animation to play (the frames folder isn't there)
+        return
 
     width = window.getWidth()
     height = window.getHeight()
 
     step = (width / 2 + 100 / 2) / (len(frames) - 1)
-    for i in range(len(frames)):
-        animationFile = frames[i]
-        anchorPt = Point(width / 2 + step * (i - 1), height / 2)
-        image = Image(anchorPt, animationFile)
-        image.draw(window)
-        sleep(0.5)  # adjust as needed for smooth transitions
-        image.undraw()
-    return
+    # one image is drawn and then moved and switched to each frame in place
+    image = Image(Point(width / 2 - step, height / 2), frames[0])
+    image.draw(window)
+    shown = {"index": 0}
+
+    def showFrame(progress):
+        # frames the scheduler skipped past (running behind) are never drawn
+        i = min(int(progress * len(frames)), len(frames) - 1)
+        if shown["index"] == i:
+            return
+        image.setImage(frames[i])
+        image.setAnchor(Point(width / 2 + step * (i - 1), height / 2))
+        shown["index"] = i
+
+    yield Tween(0.5 * len(frames), showFrame)  # 0.5s per frame
+    image.undraw()
+
+
+def displaySprite(pokemonName, gw, coordx):
+    """
+       Description: Draws a Pokemon's battle sprite from the sprite cache
+       Parameters: pokemonName- the Pokemon's name (str),
+                   gw- the Graphics Window (GraphWin object),
+                   coordx- x coordinate of the sprite's center (float)
+       Return Val: None
+    """
+    spriteCache.displayImage(pokemonName, gw, SPRITE_WIDTH, SPRITE_HEIGHT,
+                             coordx)
 
 
 def drawPlayFrame(gw, playersPokemonName, computersPokemonName):
@@ -203,73 +253,58 @@ def drawPlayFrame(gw, playersPokemonName, computersPokemonName):
        Return Val: the player's Pokemon's HP Bar (Rectangle Object), the
                    computer's Pokemon's HP Bar (Rectangle Object)
     """
-    width = gw.getWidth()
-    height = gw.getHeight()
-
-    splitHeight = height * 5 / 6
-    line1 = Line(Point(0, splitHeight), Point(width, splitHeight))
-    line1.draw(gw)
-
-    line2 = Line(Point(width * 0.2, 0), Point(width * 0.2, splitHeight))
-    line2.draw(gw)
-
-    line3 = Line(Point(width * 0.8, 0), Point(width * 0.8, splitHeight))
-    line3.draw(gw)
-
-    text1 = Text(Point(width * .1, height * .3), "PLAYER 1 (YOU)")
-    text1.draw(gw)
-    text2 = Text(Point(width * .9, height * .3), "PLAYER 2 (COMPUTER)")
-    text2.draw(gw)
-
-    text1 = Text(Point(width * .1, height * .3 + 50), playersPokemonName)
-    text1.draw(gw)
-    text2 = Text(Point(width * .9, height * .3 + 50), computersPokemonName)
-    text2.draw(gw)
-
-    resizeAndDisplayImage(playersPokemonName, gw, 110, 100, width * 0.1)
-    resizeAndDisplayImage(computersPokemonName, gw, 110, 100, width * 0.9)
-
-    playersHPBar = Rectangle(Point(width * .01, height * .16),
-                             Point(width * .19, height * .19))
-    playersHPBar.setFill("light green")
-    playersHPBar.setOutline("light green")
-    playersHPBar.draw(gw)
-
-    computersHPBar = Rectangle(Point(width * .81, height * .16),
-                               Point(width * .99, height * .19))
-    computersHPBar.setFill("light green")
-    computersHPBar.setOutline("light green")
-    computersHPBar.draw(gw)
+    # everything below is shown with one window update instead of one per
+    # object
+    with gw.batch():
+        width = gw.getWidth()
+        height = gw.getHeight()
+
+        splitHeight = height * 5 / 6
+        line1 = Line(Point(0, splitHeight), Point(width, splitHeight))
+        line1.draw(gw)
+
+        line2 = Line(Point(width * 0.2, 0), Point(width * 0.2, splitHeight))
+        line2.draw(gw)
+
+        line3 = Line(Point(width * 0.8, 0), Point(width * 0.8, splitHeight))
+        line3.draw(gw)
+
+        text1 = Text(Point(width * .1, height * .3), "PLAYER 1 (YOU)")
+        text1.draw(gw)
+        text2 = Text(Point(width * .9, height * .3), "PLAYER 2 (COMPUTER)")
+        text2.draw(gw)
+
+        text1 = Text(Point(width * .1, height * .3 + 50), playersPokemonName)
+        text1.draw(gw)
+        text2 = Text(Point(width * .9, height * .3 + 50), computersPokemonName)
+        text2.draw(gw)
+
+        displaySprite(playersPokemonName, gw, width * 0.1)
+        displaySprite(computersPokemonName, gw, width * 0.9)
+
+        playersHPBar = Rectangle(Point(width * .01, height * .16),
+                                 Point(width * .19, height * .19))
+        playersHPBar.setFill("light green")
+        playersHPBar.setOutline("light green")
+        playersHPBar.draw(gw)
+
+        computersHPBar = Rectangle(Point(width * .81, height * .16),
+                                   Point(width * .99, height * .19))
+        computersHPBar.setFill("light green")
+        computersHPBar.setOutline("light green")
+        computersHPBar.draw(gw)
 
     return playersHPBar, computersHPBar
 
 
-def getMoves(pokemonMovePool):
+def disableButtons(moveButtons):
     """
-    Description: Gets a set of four moves from a Pokemon's movepool
-    Parameters: the Pokemon's movepool (list of str)
-    Return Val: a set of four moves (list of str)
-    """
-    moveSet = []
-    while len(moveSet) < 4:
-        move = random.choice(pokemonMovePool)
-        if move not in moveSet:
-            # ensures that there are no duplicate moves in the set
-            moveSet.append(move)
-
-    return moveSet
-
-
-def disableButtons(move1Button, move2Button, move3Button, move4Button):
-    """
-    Description: disables four buttons given in parameter
-    Parameters: the four buttons (Button object)
+    Description: disables the move buttons
+    Parameters: moveButtons- the buttons (list of Button objects)
     Return Val: None
     """
-    move1Button["state"] = "disabled"
-    move2Button["state"] = "disabled"
-    move3Button["state"] = "disabled"
-    move4Button["state"] = "disabled"
+    for button in moveButtons:
+        button["state"] = "disabled"
 
 
 def displayDamageText(gw, attackingPokemon, defendingPokemon, moveUsed,
@@ -278,36 +313,32 @@ def displayDamageText(gw, attackingPokemon, defendingPokemon, moveUsed,
     Description: Displays text related to the move used and a message correlated
                  to the amount of damage it does
     Parameters: gw- the Graphics Window (GraphWin object),
-                attackingPokemon- the attacking Pokemon's stats (dict),
-                defendingPokemon- the defending Pokemon's stats (dict),
+                attackingPokemon- the attacking Pokemon (PokemonRecord),
+                defendingPokemon- the defending Pokemon (PokemonRecord),
                 moveUsed- the move used by the attacking Pokemon (str),
                 damageRoll- the amount of damage that move did (int)
-    Return Val: None
+    Return Val: steps to run with a FrameScheduler (generator)
     """
     width = gw.getWidth()
     height = gw.getHeight()
 
-    moveText = Text(Point(width * .5, height * .8), "%s used %s!" %
-                    (attackingPokemon["Name"], moveUsed))
-    moveText.draw(gw)
-    sleep(2)
-    moveText.undraw()
+    # one label is drawn and its text changed in place for the second message
+    messageText = Text(Point(width * .5, height * .8), "%s used %s!" %
+                       (attackingPokemon.name, moveUsed))
+    messageText.draw(gw)
+    yield 2
 
     if damageRoll == 0:
-        damageText = Text(Point(width * .5, height * .8), "Yikes! %s is immune "
-                                                          "to %s's attack!" %
-                          (defendingPokemon["Name"], attackingPokemon["Name"]))
+        messageText.setText("Yikes! %s is immune to %s's attack!" %
+                            (defendingPokemon.name, attackingPokemon.name))
     elif damageRoll < 10:
-        damageText = Text(Point(width * .5, height * .8), "Oof, it's not very "
-                                                          "effective...")
+        messageText.setText("Oof, it's not very effective...")
     elif damageRoll < 40:
-        damageText = Text(Point(width * .5, height * .8), "Not bad...!")
+        messageText.setText("Not bad...!")
     else:
-        damageText = Text(Point(width * .5, height * .8), "Ouch!!! That's a LOT"
-                                                          " of damage!")
-    damageText.draw(gw)
-    sleep(2)
-    damageText.undraw()
+        messageText.setText("Ouch!!! That's a LOT of damage!")
+    yield 2
+    messageText.undraw()
 
 
 def animateHPDrop(gw, HPBar, damageDone, HPLeft):
@@ -317,7 +348,7 @@ def animateHPDrop(gw, HPBar, damageDone, HPLeft):
                 HPBar- the HP bar of a Pokemon (Rectangle object),
                 damageDone- the amount of damage done (int),
                 HPLeft- the HP the Pokemon has left (int)
-    Return Val: None
+    Return Val: steps to run with a FrameScheduler (generator)
     """
     if damageDone == 0:
         # no damage done
@@ -328,211 +359,187 @@ def animateHPDrop(gw, HPBar, damageDone, HPLeft):
     HPBar.setOutline("gray")
     HPBar.draw(gw)
 
-    for i in range(damageDone + 1):
-        HPBarP1XCoord = HPBar.getP1().getX()
-        HPBarP2XCoord = HPBar.getP2().getX()
-        HPBarP2YCoord = HPBar.getP2().getY()
-        HPLeftXCoord = HPBarP1XCoord + HPLeft * (
-                HPBarP2XCoord - HPBarP1XCoord) / 100
-        hpLeftBox = Rectangle(HPBar.getP1(), Point(HPLeftXCoord, HPBarP2YCoord))
-        hpLeftBox.setFill("light green")
-        hpLeftBox.setOutline("light green")
-        hpLeftBox.draw(gw)
-        sleep(1.0 / damageDone)
-        if i != damageDone:
-            # undraws all animation frames except the last
-            hpLeftBox.undraw()
-        HPLeft -= 1
-        if HPLeft == 0:
+    HPBarP1XCoord = HPBar.getP1().getX()
+    HPBarP2XCoord = HPBar.getP2().getX()
+    HPBarP2YCoord = HPBar.getP2().getY()
+    HPAfter = max(0, HPLeft - damageDone)
+    HPBarP1 = HPBar.getP1()
+
+    # one box is drawn and then resized in place as HP drops
+    hpLeftBox = Rectangle(HPBarP1, HPBar.getP2())
+    hpLeftBox.setFill("light green")
+    hpLeftBox.setOutline("light green")
+    shown = {}
+
+    def drawHPLeft(progress):
+        # the bar shows whole HP points, so it's only resized when one is lost
+        HPShown = max(HPAfter, HPLeft - round(progress * damageDone))
+        if shown.get("hp") == HPShown:
+            return
+        shown["hp"] = HPShown
+        if HPShown == 0:
             # Pokemon has fainted
-            break
+            hpLeftBox.undraw()
+            return
+        HPLeftXCoord = HPBarP1XCoord + HPShown * (
+                HPBarP2XCoord - HPBarP1XCoord) / 100
+        hpLeftBox.setPoints(HPBarP1, Point(HPLeftXCoord, HPBarP2YCoord))
+        if hpLeftBox.canvas is None:
+            hpLeftBox.draw(gw)
+
+    yield Tween(HP_DROP_SECONDS, drawHPLeft)
 
 
-def doTurn(winPlay, gwMain, computersHPBar, playersHPBar, playersPokemon,
-           computersPokemon, playersMove, move1Button, move2Button, move3Button,
-           move4Button, HPValues, computersMoves, move2Animation):
+def doTurn(winPlay, gwMain, battle, HPBars, playersMove, moveButtons,
+           movedex):
     """
     Description: plays one turn in the game
     Parameters: winPlay- the battle Graphics Window (GraphWin object),
                 gwMain- the main Graphics Window (GraphWin object),
-                computersHPBar- HP bar of computer's Pokemon(Rectangle object),
-                playersHPBar- HP bar of player's Pokemon (Rectangle object),
-                playersPokemon- the stats of the player's Pokemon (dict),
-                computersPokemon- the stats of the computer's Pokemon (dict),
+                battle- the battle being played (Battle object),
+                HPBars- HP bars of the player's and computer's Pokemon
+                (list of Rectangle objects),
                 playersMove- the move the player picked (str),
-                move(1,2,3,4)Button- buttons representing each move (Button
-                object),
-                HPValues - HP Values for Player and Computer (list of ints),
-                computersMoves-the computer's Pokemon's moves (list of str)
-                move2Animation- move to animation database (dict)
+                moveButtons- buttons representing each move (list of Button
+                objects),
+                movedex- every move, looked up by name (Movedex object)
     Return Val: None
     """
     # user's turn has ended, disabling buttons so to prevent from clicking again
-    disableButtons(move1Button, move2Button, move3Button, move4Button)
-    # animateMove(winPlay, playersMove, move2Animation)
-    dropPokemonHP(winPlay, computersHPBar, playersPokemon, computersPokemon,
-                  playersMove, HPValues, 1)  # drop computers' HP
-
-    if HPValues[1] <= 0:
-        # game over, player won
-        endGame(winPlay, gwMain, "You")
-        return
-
-    computerMove = random.choice(computersMoves)
-    disableButtons(move1Button, move2Button, move3Button, move4Button)
-    # animateMove(winPlay, computerMove, move2Animation)
-    doComputerMove(winPlay, computerMove, computersPokemon, playersPokemon,
-                   move1Button, move2Button, move3Button, move4Button,
-                   playersHPBar, HPValues)
-
-    if HPValues[0] <= 0:
-        # computer has won, disables buttons
-        disableButtons(move1Button, move2Button, move3Button, move4Button)
-        endGame(winPlay, gwMain, "Comp")
-        return
-
-
-def doComputerMove(winPlay, computerMove, computersPokemon, playersPokemon,
-                   move1Button, move2Button, move3Button, move4Button,
-                   playersHPBar, HPValues):
+    disableButtons(moveButtons)
+
+    scheduler = FrameScheduler(winPlay, speed=INSTANT if SKIP_ANIMATIONS
+                               else ANIMATION_SPEED)
+    monitor = None
+    if MEASURE_STALLS:
+        monitor = StallMonitor(winPlay)
+        monitor.start()
+
+    def drawTurn(attacks):
+        for attack in attacks:
+            # yield from animateMove(winPlay, attack["move"].name,
+            #                        movedex)
+            yield from dropPokemonHP(winPlay, battle, HPBars, attack)
+
+        if battle.winner == PLAYER:
+            # game over, player won
+            endGame(winPlay, gwMain, "You")
+        elif battle.winner == COMPUTER:
+            endGame(winPlay, gwMain, "Comp")
+        else:
+            # end of the turn, reactivating so user can make their move
+            reactivateButtons(moveButtons)
+
+    def turnDone():
+        if monitor is not None:
+            print("Longest event loop stall this turn: %.1f ms" %
+                  (monitor.stop() * 1000))
+        if winPlay.metrics is not None:
+            print("Render metrics so far:", winPlay.getMetrics())
+
+    def turnFailed(error):
+        # the turn wasn't played, so the player can pick a move again
+        print("Error! Cannot play the turn! ", error)
+        turnDone()
+        reactivateButtons(moveButtons)
+
+    # the battle works out the turn (and its damage requests) off the Tk
+    # thread, then the attacks it reports are drawn
+    runInBackground(winPlay, lambda: battle.playTurn(playersMove),
+                    lambda attacks: scheduler.play(drawTurn(attacks),
+                                                   turnDone),
+                    turnFailed)
+
+
+def reactivateButtons(moveButtons):
     """
-      Description: Does one of the computer's turns
-      Parameters: winPlay- the battle Graphics Window (GraphWin object),
-                  computerMove- the computer's Pokemon's move (str),
-                  computersPokemon- the stats of the computer's Pokemon (dict),
-                  playersPokemon- the stats of the player's Pokemon (dict),
-                  move(1,2,3,4)Button- buttons representing each move (Button
-                  object),
-                  HPValues - HP Values for Player and Computer (list of ints),
-      Return Val: None
-      """
-    # user's turn has ended, disabling buttons so to prevent from clicking again
-    dropPokemonHP(winPlay, playersHPBar, computersPokemon, playersPokemon,
-                  computerMove, HPValues, 0)  # drop player's HP
-    # end of computer's turn, reactivating so user can make their move
-    reactivateButtons(move1Button, move2Button, move3Button, move4Button)
+    Description: Reactivates all the move buttons
+    Parameters: moveButtons- the buttons (list of Button objects)
+    Return Val: None
+    """
+    for button in moveButtons:
+        button["state"] = "normal"
 
 
-def reactivateButtons(move1Button, move2Button, move3Button, move4Button):
+def dropPokemonHP(gw, battle, HPBars, attack):
     """
-    Description: Reactivates all four buttons
-    Parameters: each of the four buttons (Button object)
-    Return Val: None
+    Description: Shows one attack and drops the defending Pokemon's HP bar
+    Parameters: gw- Graphics Window (GraphWin object),
+                battle- the battle being played (Battle object),
+                HPBars- HP bars of the player's and computer's Pokemon
+                (list of Rectangle objects),
+                attack- one of the attacks from Battle.playTurn (dict)
+    Return Val: steps to run with a FrameScheduler (generator)
     """
-    move1Button["state"] = "normal"
-    move2Button["state"] = "normal"
-    move3Button["state"] = "normal"
-    move4Button["state"] = "normal"
+    attackingPokemon = battle.battlers[attack["attacker"]].pokemon
+    defendingPokemon = battle.battlers[attack["defender"]].pokemon
+    yield from displayDamageText(gw, attackingPokemon, defendingPokemon,
+                                 attack["move"].name, attack["damage"])
+    yield from animateHPDrop(gw, HPBars[attack["defender"]], attack["damage"],
+                             attack["hpBefore"])
 
 
-def dropPokemonHP(gw, defendingHPBar, attackingPokemon, defendingPokemon,
-                  moveUsed, HPValues, playerIndex):
+def pickMatchup(pokedex, tier=None):
     """
-    Description: Drops the HP of a given Pokemon
-    Parameters: gw- Graphics Window (GraphWin object),
-                defendingHPBar- HP bar of defending Pokemon (Rectangle object),
-                attackingPokemon- the stats of the attacking Pokemon (dict),
-                defendingPokemon- the stats of the defending Pokemon (dict),
-                moveUsed- the move used (str),
-                HPValues- the amount of HP the defending Pokemon has left (int)
-                playerIndex- player index, 0 for player, 1 for computer (int)
-    Return Val: None
+    Description: Picks the Pokemon for a battle
+    Parameters: pokedex- the indexed roster (Pokedex object),
+                tier- only pick Pokemon from this tier, None for any (str)
+    Return Val: the player's and the computer's Pokemon (tuple of
+                PokemonRecord objects)
     """
-    damageRoll = calculateDamage(attackingPokemon, defendingPokemon, moveUsed)
-    displayDamageText(gw, attackingPokemon, defendingPokemon, moveUsed,
-                      damageRoll)
-    animateHPDrop(gw, defendingHPBar, damageRoll, HPValues[playerIndex])
-    HPValues[playerIndex] -= damageRoll
+    # an unknown tier has no Pokemon, so the whole roster is used instead
+    candidates = pokedex.find(tier=tier) or pokedex.pokemon
+    return random.choice(candidates), random.choice(candidates)
 
 
-def playGame(gwMain, pokemonData, move2Animation):
+def warmUpSprites(gw, matchup):
+    """Starts loading a matchup's sprites into the sprite cache"""
+    spriteCache.warmUp(gw, [pokemon.name for pokemon in matchup],
+                       SPRITE_WIDTH, SPRITE_HEIGHT)
+
+
+def playGame(gwMain, pokedex, moveRecords, movedex):
     """
     Description: Plays the Pokemon Game
     Parameters: gwMain- the main Graphics Window (GraphWin object),
-                pokemonData- the Pokemon data (list of Pokemon stats)
-                move2Animation- move to animation database (dict)
+                pokedex- the indexed roster (Pokedex object),
+                moveRecords- every move, in ID order (list of MoveRecord)
+                movedex- every move, looked up by name (Movedex object)
     Return Val: None
     """
-    playersPokemon = random.choice(pokemonData)
-    playersMoves = getMoves(playersPokemon["Moves"])
-
-    computersPokemon = random.choice(pokemonData)
-    computersMoves = getMoves(computersPokemon["Moves"])
+    global nextMatchup
+    playersPokemon, computersPokemon = nextMatchup or \
+        pickMatchup(pokedex, MATCHUP_TIER)
+    nextMatchup = pickMatchup(pokedex, MATCHUP_TIER)
+    warmUpSprites(gwMain, nextMatchup)
+    battle = Battle(playersPokemon, computersPokemon, moveRecords,
+                    calculateDamages=calculateDamageBatch)
+    playersMoves = battle.battlers[PLAYER].moves
 
     width = 800
     height = 600
     winPlay = GraphWin("Pokemon Battle! ", width, height)
+    if SHOW_RENDER_METRICS:
+        winPlay.enableMetrics(overlay=True)
     playersHPBar, computersHPBar = drawPlayFrame(winPlay,
-                                                 playersPokemon["Name"],
-                                                 computersPokemon["Name"])
+                                                 playersPokemon.name,
+                                                 computersPokemon.name)
+    HPBars = [playersHPBar, computersHPBar]
     buttonY = height * 0.9
     buttonWidth = 20
 
-    # uses an array so that the lambda function can update the HP values
-    HPValues = [100, 100]  # [playersHP, computersHP]
-
-    move1Button = tk.Button(winPlay, width=buttonWidth, text=playersMoves[0],
-                            command=lambda: doTurn(winPlay, gwMain,
-                                                   computersHPBar,
-                                                   playersHPBar, playersPokemon,
-                                                   computersPokemon,
-                                                   playersMoves[0],
-                                                   move1Button, move2Button,
-                                                   move3Button, move4Button,
-                                                   HPValues,
-                                                   computersMoves,
-                                                   move2Animation))
-    move1Button.place(x=width / 5 - buttonWidth * 5, y=buttonY)
-
-    move2Button = tk.Button(winPlay, width=buttonWidth, text=playersMoves[1],
-                            command=lambda: doTurn(winPlay, gwMain,
-                                                   computersHPBar,
-                                                   playersHPBar, playersPokemon,
-                                                   computersPokemon,
-                                                   playersMoves[1],
-                                                   move1Button, move2Button,
-                                                   move3Button, move4Button,
-                                                   HPValues,
-                                                   computersMoves,
-                                                   move2Animation))
-    move2Button.place(x=width / 5 * 2 - buttonWidth * 5, y=buttonY)
-
-    move3Button = tk.Button(winPlay, width=buttonWidth, text=playersMoves[2],
-                            command=lambda: doTurn(winPlay, gwMain,
-                                                   computersHPBar,
-                                                   playersHPBar, playersPokemon,
-                                                   computersPokemon,
-                                                   playersMoves[2],
-                                                   move1Button, move2Button,
-                                                   move3Button, move4Button,
-                                                   HPValues,
-                                                   computersMoves,
-                                                   move2Animation))
-    move3Button.place(x=width / 5 * 3 - buttonWidth * 5, y=buttonY)
-
-    move4Button = tk.Button(winPlay, width=buttonWidth, text=playersMoves[3],
-                            command=lambda: doTurn(winPlay, gwMain,
-                                                   computersHPBar,
-                                                   playersHPBar, playersPokemon,
-                                                   computersPokemon,
-                                                   playersMoves[3],
-                                                   move1Button, move2Button,
-                                                   move3Button, move4Button,
-                                                   HPValues,
-                                                   computersMoves,
-                                                   move2Animation))
-    move4Button.place(x=width / 5 * 4 - buttonWidth * 5, y=buttonY)
-
-    if computersPokemon["Speed"] > playersPokemon["Speed"]:
-        # computer's pokemon is faster, so computer plays first
-        disableButtons(move1Button, move2Button, move3Button, move4Button)
-        computerMove = random.choice(computersMoves)
-        # animateMove(winPlay, computerMove, move2Animation)
-        doComputerMove(winPlay, computerMove, computersPokemon,
-                       playersPokemon, move1Button, move2Button,
-                       move3Button, move4Button, playersHPBar, HPValues)
-        if HPValues[0] <= 0:
-            endGame(winPlay, gwMain, "Comp")
+    # one button per move (a species with a small movepool can have fewer
+    # than four), spread evenly along the bottom; they're all added to this
+    # list so each button's command can disable every one of them
+    moveButtons = []
+    for i, move in enumerate(playersMoves):
+        moveButton = makeButton(winPlay, width=buttonWidth, text=move.name,
+                                command=lambda move=move: doTurn(
+                                    winPlay, gwMain, battle, HPBars, move,
+                                    moveButtons, movedex))
+        moveButton.place(x=width / (len(playersMoves) + 1) * (i + 1) -
+                         buttonWidth * 5, y=buttonY)
+        moveButtons.append(moveButton)
 
 
 def endGame(winPlay, gwMain, winner):
@@ -560,32 +567,45 @@ def endGame(winPlay, gwMain, winner):
 
 
 def main():
-    pokemonData = readPokeFile("pokemon-data.csv")
-    move2Animation = readMoveFile()
+    global damageMatrix, damageCache, spriteCache, nextMatchup, \
+        animationSheets
+    pokemonData, moveRecords = loadDatasets()
+    pokedex = Pokedex(pokemonData)
+    movedex = Movedex(moveRecords)
+    if DamageMatrix is not None:
+        damageMatrix = DamageMatrix(pokemonData, moveRecords)
+    damageCache = DamageCache()
 
     width = 800
     height = 500
     gwMain = GraphWin("Pokemon Battles! ", width, height)
+    # rebuilds the atlas first if a sprite changed since it was built
+    atlasIndex = readAtlasIndex([pokemon.name for pokemon in pokemonData])
+    spriteCache = SpriteCache(SpriteAtlas(ATLAS_IMAGE, atlasIndex))
+    nextMatchup = pickMatchup(pokedex, MATCHUP_TIER)
+    warmUpSprites(gwMain, nextMatchup)
+    animationSheets = AnimationSheets(readAnimationIndex(), SHEET_DIR)
 
     displayImage(gwMain)
 
     buttonY = height * 0.9
     buttonWidth = 20
 
-    helpButton = tk.Button(gwMain, width=buttonWidth, text="Help",
-                           command=popupTutorial)
+    helpButton = makeButton(gwMain, width=buttonWidth, text="Help",
+                            command=popupTutorial)
     helpButton.place(x=width / 4 - buttonWidth * 5, y=buttonY)
 
-    playButton = tk.Button(gwMain, width=buttonWidth, text="Play",
-                           command=lambda: playGame(gwMain, pokemonData,
-                                                    move2Animation))
+    playButton = makeButton(gwMain, width=buttonWidth, text="Play",
+                            command=lambda: playGame(gwMain, pokedex,
+                                                     moveRecords, movedex))
     playButton.place(x=width / 4 * 2 - buttonWidth * 5, y=buttonY)
 
-    quitButton = tk.Button(gwMain, width=buttonWidth, text="Quit",
-                           command=gwMain.quit)
+    quitButton = makeButton(gwMain, width=buttonWidth, text="Quit",
+                            command=gwMain.quit)
     quitButton.place(x=width / 4 * 3 - buttonWidth * 5, y=buttonY)
 
     gwMain.mainloop()
 
 
-main()
+if __name__ == "__main__":
+    main()
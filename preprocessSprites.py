@@ -0,0 +1,175 @@
+from spriteAtlas import SPRITE_DIR, SPRITE_WIDTH, SPRITE_HEIGHT
+from PIL import Image
+from multiprocessing import Pool
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+"""
+    Description: Resizes every original sprite in sprites/ to a set of
+                 resolutions ahead of time, spread across a pool of worker
+                 processes. Outputs go to sprite-cache/<width>x<height>/ and
+                 a manifest records the content hash of the sprite each
+                 output was made from, so a rerun only redoes sprites that
+                 changed, new species and new sizes. Sizes left out of a
+                 run are kept unless --prune is given.
+
+    Usage: python preprocessSprites.py --sizes 110x100 55x50 --workers 4
+"""
+
+CACHE_DIR = "sprite-cache"
+MANIFEST = "manifest.json"
+DEFAULT_SIZES = ["%dx%d" % (SPRITE_WIDTH, SPRITE_HEIGHT)]
+
+
+def parseSize(text):
+    """Turns "110x100" into (110, 100)"""
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def cachedSpritePath(filename, width, height, cacheDir=CACHE_DIR):
+    """
+        Description: Gets where a resized sprite goes in the cache
+        Parameters: filename- the original sprite's file name, e.g.
+                    "arcanine.png" (str),
+                    width, height- the size (int),
+                    cacheDir- the cache folder (str)
+        Return Val: the resized sprite's path (str)
+    """
+    return os.path.join(cacheDir, "%dx%d" % (width, height), filename)
+
+
+def hashFile(path):
+    with open(path, "rb") as infile:
+        return hashlib.sha1(infile.read()).hexdigest()
+
+
+def findSprites(spriteDir=SPRITE_DIR):
+    """Lists the original sprites (file names), leaving out the atlas"""
+    return sorted(name for name in os.listdir(spriteDir)
+                  if name.endswith(".png") and not name.startswith("atlas")
+                  and not name.startswith("NEW_"))
+
+
+def readManifest(cacheDir=CACHE_DIR):
+    try:
+        with open(os.path.join(cacheDir, MANIFEST)) as infile:
+            return json.load(infile)
+    except (OSError, ValueError):
+        return {"outputs": {}}
+
+
+def resizeSprite(task):
+    """
+        Description: Resizes one sprite (run in a worker process)
+        Parameters: task- (original sprite path, output path, width, height)
+                    (tuple)
+        Return Val: the output path (str)
+    """
+    source, output, width, height = task
+    with Image.open(source) as sprite:
+        resized = sprite.convert("RGBA").resize((width, height),
+                                                Image.LANCZOS)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    # write under a temporary name so an interrupted run can't leave a
+    # half-written sprite that looks finished
+    resized.save(output + ".tmp", "PNG")
+    os.replace(output + ".tmp", output)
+    return output
+
+
+def preprocess(sizes, spriteDir=SPRITE_DIR, cacheDir=CACHE_DIR, workers=None,
+               force=False, prune=False):
+    """
+        Description: Brings the sprite cache up to date
+        Parameters: sizes- the resolutions to make (list of (width, height)),
+                    spriteDir- folder with the original sprites (str),
+                    cacheDir- the cache folder (str),
+                    workers- worker processes (int, None for one per core),
+                    force- redo every sprite even if it's unchanged (bool),
+                    prune- also delete sizes that aren't in sizes (bool);
+                    otherwise they're kept, so adding a size only costs
+                    the new work
+        Return Val: how many sprites were resized and skipped (tuple of int)
+    """
+    manifest = readManifest(cacheDir)
+    outputs = manifest["outputs"]
+    tasks = []
+    skipped = 0
+    current = {}
+    sprites = findSprites(spriteDir)
+    for filename in sprites:
+        source = os.path.join(spriteDir, filename)
+        digest = hashFile(source)
+        for width, height in sizes:
+            output = cachedSpritePath(filename, width, height, cacheDir)
+            key = os.path.relpath(output, cacheDir).replace(os.sep, "/")
+            current[key] = {"source": filename, "sha1": digest,
+                            "size": [width, height]}
+            if not force and outputs.get(key) == current[key] and \
+                    os.path.exists(output):
+                skipped += 1
+            else:
+                tasks.append((source, output, width, height))
+
+    if tasks:
+        with Pool(workers) as pool:
+            for done, output in enumerate(
+                    pool.imap_unordered(resizeSprite, tasks), 1):
+                sys.stderr.write("\r%d/%d sprites resized" % (done,
+                                                              len(tasks)))
+        sys.stderr.write("\n")
+
+    # outputs of sizes not asked for this time are kept, unless pruning;
+    # outputs of sprites that are gone are left out of the manifest (and
+    # deleted) so the cache only lists what's valid
+    found = set(sprites)
+    for key, entry in outputs.items():
+        if key not in current and entry.get("source") in found and \
+                not prune:
+            current[key] = entry
+    for key in set(outputs) - set(current):
+        stale = os.path.join(cacheDir, key)
+        if os.path.exists(stale):
+            os.remove(stale)
+            if not os.listdir(os.path.dirname(stale)):
+                os.rmdir(os.path.dirname(stale))
+    os.makedirs(cacheDir, exist_ok=True)
+    with open(os.path.join(cacheDir, MANIFEST), "w") as outfile:
+        json.dump({"outputs": current}, outfile, indent=1, sort_keys=True)
+    return len(tasks), skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Resize every sprite to a set of resolutions")
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES,
+                        help="resolutions as WIDTHxHEIGHT (default: %s)" %
+                             " ".join(DEFAULT_SIZES))
+    parser.add_argument("--sprites", default=SPRITE_DIR,
+                        help="folder with the original sprites "
+                             "(default: %s)" % SPRITE_DIR)
+    parser.add_argument("--cache", default=CACHE_DIR,
+                        help="output folder (default: %s)" % CACHE_DIR)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: one per core)")
+    parser.add_argument("--force", action="store_true",
+                        help="redo every sprite, even unchanged ones")
+    parser.add_argument("--prune", action="store_true",
+                        help="delete cached sizes not listed in --sizes")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    resized, skipped = preprocess([parseSize(x) for x in args.sizes],
+                                  args.sprites, args.cache, args.workers,
+                                  args.force, args.prune)
+    print("%d resized, %d unchanged, %.2fs" %
+          (resized, skipped, time.perf_counter() - start))
+
+
+if __name__ == "__main__":
+    main()
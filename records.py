@@ -0,0 +1,100 @@
+from move import readPokeFile, readMoveDetails
+from movepool import compileMovepool
+import sys
+
+"""
+    Description: Compact records for the Pokemon and move data. readPokeFile
+                 and readMoveDetails give one dict per row with every stat
+                 left as a string; these records use __slots__, parse stats
+                 to ints once, intern repeated strings (types, abilities,
+                 tiers, categories) and store each movepool as an array of
+                 unique move IDs (indexes into the move list).
+"""
+
+PHYSICAL, SPECIAL, STATUS = 0, 1, 2
+CATEGORIES = {"Physical": PHYSICAL, "Special": SPECIAL, "Status": STATUS}
+
+
+class MoveRecord:
+
+    """One row of move-data.csv"""
+
+    __slots__ = ("id", "name", "type", "typeId", "category", "categoryId",
+                 "pp", "power", "accuracy")
+
+    def __init__(self, moveId, name, moveData):
+        self.id = moveId
+        self.name = name
+        self.type = sys.intern(moveData["Type"])
+        self.typeId = moveData["TypeId"]
+        self.category = sys.intern(moveData["Category"])
+        self.categoryId = CATEGORIES[self.category]
+        self.pp = moveData["PP"]
+        self.power = moveData["Power"]  # None for moves without a set power
+        self.accuracy = moveData["Accuracy"]
+
+    def __repr__(self):
+        return "MoveRecord({}, {})".format(self.id, self.name)
+
+
+class PokemonRecord:
+
+    """One row of pokemon-data.csv"""
+
+    __slots__ = ("id", "name", "types", "typeIds", "abilities", "tier", "hp",
+                 "attack", "defense", "spAttack", "spDefense", "speed",
+                 "moveIds")
+
+    def __init__(self, pokemonId, pokemon, moveIds):
+        self.id = pokemonId
+        self.name = pokemon["Name"]
+        self.types = tuple(sys.intern(x) for x in pokemon["Types"])
+        self.typeIds = pokemon["TypeIds"]
+        self.abilities = tuple(sys.intern(x) for x in pokemon["Abilities"])
+        self.tier = sys.intern(pokemon["Tier"])
+        self.hp = int(pokemon["HP"])
+        self.attack = int(pokemon["Attack"])
+        self.defense = int(pokemon["Defense"])
+        self.spAttack = int(pokemon["Special Attack"])
+        self.spDefense = int(pokemon["Special Defense"])
+        self.speed = int(pokemon["Speed"])
+        self.moveIds = moveIds
+
+    def __repr__(self):
+        return "PokemonRecord({}, {})".format(self.id, self.name)
+
+
+def readMoveRecords(filename="move-data.csv"):
+    """
+        Description: Reads move-data.csv into MoveRecords
+        Parameters: filename- the move data file (str)
+        Return Val: the moves, each at the index of its ID (list of
+                    MoveRecord objects)
+    """
+    moveRecords = []
+    for name, moveData in readMoveDetails(filename).items():
+        moveRecords.append(MoveRecord(len(moveRecords), name, moveData))
+    return moveRecords
+
+
+def readPokemonRecords(filename, moveRecords):
+    """
+        Description: Reads pokemon-data.csv into PokemonRecords
+        Parameters: filename- the Pokemon data file (str),
+                    moveRecords- from readMoveRecords (list of MoveRecord)
+        Return Val: the Pokemon, each at the index of its ID (list of
+                    PokemonRecord objects)
+
+        Movepools are compiled with movepool.compileMovepool: repeated moves
+        and entries that aren't in move-data.csv are left out.
+    """
+    moveIdsByName = {}
+    for move in moveRecords:
+        moveIdsByName[move.name] = move.id
+
+    pokemonRecords = []
+    for pokemon in readPokeFile(filename):
+        moveIds = compileMovepool(pokemon["Moves"], moveIdsByName)[0]
+        pokemonRecords.append(PokemonRecord(len(pokemonRecords), pokemon,
+                                            moveIds))
+    return pokemonRecords
@@ -6,34 +6,232 @@
 """
 
 import graphics
-from PIL import Image, ImageTk
-import requests
-from io import BytesIO
+from PIL import Image
+from spriteAtlas import spritePath
+from preprocessSprites import cachedSpritePath
+from turnPipeline import runInBackground
+from collections import OrderedDict
+import os
+
+# sprites shown by resizeAndDisplayImage, made on first use (SpriteCache)
+defaultSpriteCache = None
 
 #------------------------------------------------------------------------------#
 def resizeAndDisplayImage(pokemon, window, imgWidth, imgHeight, coordx):
+    global defaultSpriteCache
+
+    # The resized image is kept in a sprite cache, so showing the same
+    # species again doesn't open and resize the file again
+    if defaultSpriteCache is None:
+        defaultSpriteCache = SpriteCache()
+    defaultSpriteCache.displayImage(pokemon, window, imgWidth, imgHeight,
+                                    coordx)
 
-    # Path and filename for image file (can be .GIF .JPG or .PNG format)
-    filename = "%s.png" % pokemon
+    return
+#------------------------------------------------------------------------------#
+class SpriteAtlas:
 
-    # Open the image file and resize to specified dimensions
-    imageTmp = Image.open("sprites/" + filename)
-    newDimesions = (imgWidth, imgHeight)
-    imageTmp = imageTmp.resize(newDimesions, Image.ANTIALIAS)
+    """Sprites cropped out of the atlas built by spriteAtlas.buildAtlas. The
+    atlas image is decoded once; each sprite is copied out of it in memory."""
 
-    # Save the resized image as a separate file (by changing filename)
-    filename = "NEW_" + filename
-    imageTmp.save("sprites/"+ filename)
+    def __init__(self, imageFile, index):
+        """
+            Parameters: imageFile- the atlas image (str),
+                        index- the atlas index (dict, see
+                        spriteAtlas.buildAtlas)
+        """
+        self.sheet = graphics.photoFromFile(imageFile)
+        self.width, self.height = index["size"]
+        self.positions = index["sprites"]
 
-    # Load the resized image and convert to (Tkinter Graphics) Image object
-    photo = ImageTk.PhotoImage(file="sprites/" + filename)
+    def has(self, pokemon, imgWidth, imgHeight):
+        return pokemon in self.positions and \
+            (imgWidth, imgHeight) == (self.width, self.height)
 
-    # Display image file (must be in .GIF format)
-    anchorPt = graphics.Point(coordx, window.getHeight()/2)
-    pokedexImg = graphics.Image(anchorPt, "sprites/" + filename)
-    pokedexImg.draw(window)
+    def crop(self, pokemon):
+        """
+            Description: Copies a species' sprite out of the atlas
+            Parameters: pokemon- the species (str)
+            Return Val: the sprite (photo image)
+        """
+        x, y = self.positions[pokemon]
+        return graphics.cropPhoto(self.sheet, x, y, self.width, self.height)
+#------------------------------------------------------------------------------#
+class AnimationSheets:
 
-    return
+    """Every move animation's frames, cut out of the sheets built by
+    animationSheets.buildSheets once when loaded"""
+
+    def __init__(self, index, sheetDir):
+        """
+            Parameters: index- the sheet index (dict, see
+                        animationSheets.buildSheets),
+                        sheetDir- folder with the sheets (str)
+        """
+        self.frames = {}
+        for animation, entry in index.items():
+            sheet = graphics.photoFromFile(os.path.join(sheetDir,
+                                                        entry["sheet"]))
+            self.frames[animation] = [
+                graphics.cropPhoto(sheet, x, y, width, height)
+                for x, y, width, height in entry["frames"]]
+
+    def getFrames(self, animation):
+        """
+            Description: Gets an animation's frames
+            Parameters: animation- the animation, i.e. a type (str, e.g.
+                        "fire")
+            Return Val: the frames in order, empty if there's no such
+                        animation (list of photo images)
+        """
+        return self.frames.get(animation, [])
+#------------------------------------------------------------------------------#
+def loadResizedImage(pokemon, imgWidth, imgHeight):
+    """
+        Description: Opens and resizes a species' original sprite, or opens
+                     the copy preprocessSprites.py already made at that size.
+                     Only uses PIL, so it's safe to call off the Tk thread.
+        Parameters: pokemon- the species (str),
+                    imgWidth, imgHeight- the size to resize to (int)
+        Return Val: the resized sprite (PIL Image)
+    """
+    source = spritePath(pokemon)
+    resized = cachedSpritePath(os.path.basename(source), imgWidth, imgHeight)
+    if os.path.exists(resized) and \
+            os.path.getmtime(resized) >= os.path.getmtime(source):
+        with Image.open(resized) as imageTmp:
+            return imageTmp.convert("RGBA")
+
+    with Image.open(source) as imageTmp:
+        return imageTmp.convert("RGBA").resize((imgWidth, imgHeight),
+                                               Image.LANCZOS)
+#------------------------------------------------------------------------------#
+class SpriteCache:
+
+    """Ready-to-draw Tk sprite images, kept in least recently used order up
+    to a memory cap, so a species shown again isn't decoded or cropped
+    again"""
+
+    def __init__(self, atlas=None, maxBytes=16 * 1024 * 1024):
+        """
+            Parameters: atlas- sprites are cropped from here when it has them
+                        at the right size, otherwise resized from the
+                        original sprite (SpriteAtlas object),
+                        maxBytes- memory cap, counting 4 bytes per pixel (int)
+        """
+        self.atlas = atlas
+        self.maxBytes = maxBytes
+        self.images = OrderedDict()  # (species, width, height) -> photo image
+        self.bytes = 0
+        self.pending = {}  # keys being warmed up -> window they wait in
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _store(self, key, image):
+        if key in self.images:
+            return
+        size = key[1] * key[2] * 4
+        while self.images and self.bytes + size > self.maxBytes:
+            oldKey, oldImage = self.images.popitem(last=False)
+            self.bytes -= oldKey[1] * oldKey[2] * 4
+            self.evictions += 1
+        self.images[key] = image
+        self.bytes += size
+
+    def _makeImage(self, pokemon, imgWidth, imgHeight):
+        if self.atlas is not None and \
+                self.atlas.has(pokemon, imgWidth, imgHeight):
+            return self.atlas.crop(pokemon)
+        return graphics.photoFromPIL(loadResizedImage(pokemon, imgWidth,
+                                                      imgHeight))
+
+    def get(self, pokemon, imgWidth, imgHeight):
+        """
+            Description: Gets a species' sprite, making it if it's not cached
+            Parameters: pokemon- the species (str),
+                        imgWidth, imgHeight- the sprite's size (int)
+            Return Val: the sprite (photo image)
+        """
+        key = (pokemon, imgWidth, imgHeight)
+        image = self.images.get(key)
+        if image is not None:
+            self.hits += 1
+            self.images.move_to_end(key)
+            return image
+        self.misses += 1
+        image = self._makeImage(pokemon, imgWidth, imgHeight)
+        self._store(key, image)
+        return image
+
+    def displayImage(self, pokemon, window, imgWidth, imgHeight, coordx):
+        """Draws a species' sprite, same placement as resizeAndDisplayImage"""
+        anchorPt = graphics.Point(coordx, window.getHeight()/2)
+        pokedexImg = graphics.Image(anchorPt,
+                                    self.get(pokemon, imgWidth, imgHeight))
+        pokedexImg.draw(window)
+
+    def warmUp(self, widget, pokemonNames, imgWidth, imgHeight):
+        """
+            Description: Preloads sprites that are likely to be shown next.
+                         Sprites in the atlas are cropped when Tk is idle;
+                         others are decoded and resized on a background
+                         thread and turned into Tk images back on the Tk
+                         thread.
+            Parameters: widget- the window to wait in, used for after()
+                        (GraphWin object),
+                        pokemonNames- the species to preload (list of str),
+                        imgWidth, imgHeight- the sprites' size (int)
+            Return Val: None
+        """
+        for pokemon in pokemonNames:
+            key = (pokemon, imgWidth, imgHeight)
+            if key in self.images:
+                continue
+            # a load waiting in a window that has closed will never finish
+            pendingWidget = self.pending.get(key)
+            if pendingWidget is not None and not pendingWidget.isClosed():
+                continue
+            self.pending[key] = widget
+            if self.atlas is not None and \
+                    self.atlas.has(pokemon, imgWidth, imgHeight):
+                widget.after_idle(self._finishWarmUp, key, None)
+            else:
+                runInBackground(
+                    widget,
+                    lambda key=key: loadResizedImage(*key),
+                    lambda resized, key=key: self._finishWarmUp(key, resized),
+                    lambda error, key=key: self._failWarmUp(key, error))
+
+    def _finishWarmUp(self, key, resized):
+        try:
+            if key in self.images:
+                return
+            if resized is None:
+                image = self.atlas.crop(key[0])
+            else:
+                image = graphics.photoFromPIL(resized)
+            self._store(key, image)
+        finally:
+            # even if making the image failed, so it can be tried again
+            self.pending.pop(key, None)
+
+    def _failWarmUp(self, key, error):
+        self.pending.pop(key, None)
+        print("Could not preload sprite: ", key[0], error)
+
+    def getStats(self):
+        """
+            Description: Gets the cache's counters
+            Parameters: None
+            Return Val: hits, misses, hitRate, evictions, size (sprites) and
+                        bytes (dict)
+        """
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses,
+                "hitRate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions, "size": len(self.images),
+                "bytes": self.bytes}
 #------------------------------------------------------------------------------#
 def main():
     gw = graphics.GraphWin("Resize and Display Image Example", 600, 600)
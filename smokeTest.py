@@ -0,0 +1,153 @@
+import os
+import sys
+import tempfile
+
+# must be set before graphics is imported
+os.environ["GRAPHICS_BACKEND"] = "headless"
+
+from PIL import Image as PILImage
+from graphics import GraphWin, Image, Rectangle, Point
+import numpy as np
+from dataCache import loadDatasets
+from pokedex import Pokedex, Movedex
+from spriteAtlas import buildAtlas, SPRITE_WIDTH, SPRITE_HEIGHT
+from animationSheets import buildSheets
+from resizeImageZelle import SpriteAtlas, SpriteCache, AnimationSheets
+from turnPipeline import FrameScheduler
+import pokemonPlay
+
+"""
+    Description: Headless smoke test of the battle window's drawing. Builds
+                 a sprite atlas and an animation sheet in a temporary
+                 folder, draws a battle frame, then plays an HP drop and a
+                 move animation on a FrameScheduler, all with the headless
+                 graphics backend, so it runs without a display (e.g. on
+                 CI). Also checks Image's bulk pixel reads and writes.
+                 Stops with an AssertionError if something is off.
+
+    Usage: python smokeTest.py
+"""
+
+
+def makeFrames(frameDir, animation="normal", count=3):
+    """Writes count plain frames for an animation, like frames/ has"""
+    os.makedirs(frameDir)
+    for number in range(1, count + 1):
+        frame = PILImage.new("RGB", (40, 40), (50 * number, 0, 0))
+        frame.save(os.path.join(frameDir, "%sframe%d.gif" % (animation,
+                                                             number)))
+
+
+def runSchedule(win, steps, speed=20):
+    """
+        Description: Plays steps on a FrameScheduler until they're done
+        Parameters: win- the window (GraphWin object),
+                    steps- the drawing steps (generator),
+                    speed- speed multiplier, high so it finishes fast (float)
+        Return Val: None
+    """
+    done = []
+    FrameScheduler(win, speed=speed).play(steps, lambda: done.append(True))
+    win.mainloop()
+    assert done, "steps didn't finish"
+
+
+def checkBattleFrame(workDir, pokemonData):
+    pokedex = Pokedex(pokemonData)
+    playersPokemon, computersPokemon = pokemonPlay.pickMatchup(pokedex)
+
+    # sprites come out of an atlas, like in the game
+    atlasImage = os.path.join(workDir, "atlas.png")
+    atlasIndex = buildAtlas([playersPokemon.name, computersPokemon.name],
+                            imageFile=atlasImage,
+                            indexFile=os.path.join(workDir, "atlas.json"))
+    pokemonPlay.spriteCache = SpriteCache(SpriteAtlas(atlasImage,
+                                                      atlasIndex))
+
+    win = GraphWin("Smoke test", 800, 600)
+    playersHPBar, computersHPBar = pokemonPlay.drawPlayFrame(
+        win, playersPokemon.name, computersPokemon.name)
+    sprites = [x for x in win.items if isinstance(x, Image)]
+    assert len(sprites) == 2, "sprites not drawn"
+    for sprite in sprites:
+        assert (sprite.getWidth(), sprite.getHeight()) == \
+            (SPRITE_WIDTH, SPRITE_HEIGHT), "sprite has the wrong size"
+
+    # drop the computer's HP from 100 to 40
+    itemsBefore = len(win.items)
+    runSchedule(win, pokemonPlay.animateHPDrop(win, computersHPBar, 60, 100))
+    boxes = [x for x in win.items if isinstance(x, Rectangle) and
+             x not in (playersHPBar, computersHPBar)]
+    assert len(win.items) == itemsBefore + 1, "HP drop drew extra items"
+    left = boxes[0].getP2().getX() - boxes[0].getP1().getX()
+    full = computersHPBar.getP2().getX() - computersHPBar.getP1().getX()
+    assert abs(left - full * 0.4) < 1e-6, "HP bar shows the wrong HP"
+
+    # the rendered frame has the sprites and the bar in it
+    frame = win.rasterize().convert("RGB")
+    assert frame.size == (800, 600)
+    for sprite in sprites:
+        x = sprite.getAnchor().getX()
+        y = sprite.getAnchor().getY()
+        region = frame.crop((int(x - SPRITE_WIDTH / 2),
+                             int(y - SPRITE_HEIGHT / 2),
+                             int(x + SPRITE_WIDTH / 2),
+                             int(y + SPRITE_HEIGHT / 2)))
+        assert any(low < 255 for low, high in region.getextrema()), \
+            "sprite missing from the rendered frame"
+    win.close()
+
+
+def checkMoveAnimation(workDir, moveRecords):
+    frameDir = os.path.join(workDir, "frames")
+    sheetDir = os.path.join(frameDir, "sheets")
+    makeFrames(frameDir)
+    index = buildSheets(frameDir, sheetDir,
+                        os.path.join(sheetDir, "index.json"))
+    pokemonPlay.animationSheets = AnimationSheets(index, sheetDir)
+
+    win = GraphWin("Smoke test", 800, 600)
+    movedex = Movedex(moveRecords)
+    runSchedule(win, pokemonPlay.animateMove(win, "Tackle", movedex))
+    assert len(win.items) == 0, "animation left its image drawn"
+    win.close()
+
+
+def checkPlayGame(pokemonData, moveRecords):
+    pokemonPlay.nextMatchup = None
+    gwMain = GraphWin("Smoke test", 800, 500)
+    pokemonPlay.playGame(gwMain, Pokedex(pokemonData), moveRecords,
+                         Movedex(moveRecords))
+    assert pokemonPlay.nextMatchup is not None, "next matchup not picked"
+    gwMain.close()
+
+
+def checkPixels():
+    image = Image(Point(0, 0), 4, 2)
+    pixels = np.zeros((2, 4, 4), dtype=np.uint8)
+    pixels[0, 1] = [200, 100, 50, 128]  # half transparent
+    image.setPixels(pixels)
+    # out of range values are clamped, not wrapped around
+    image.setPixels(np.array([[[300.0, -20.0, 10.0]]]), 2, 1)
+
+    read = image.getPixelArray()
+    assert read.shape == (2, 4, 3)
+    assert list(read[0, 1]) == [200, 100, 50], "RGBA pixel changed color"
+    assert list(read[1, 2]) == [255, 0, 10], "pixel values not clamped"
+    assert image.toPIL().getpixel((1, 0))[3] == 255, \
+        "alpha wasn't ignored, the pixel isn't opaque"
+    assert image.getPixels(1, 0, 1, 1) == bytes([200, 100, 50])
+
+
+def main():
+    pokemonData, moveRecords = loadDatasets()
+    with tempfile.TemporaryDirectory() as workDir:
+        checkBattleFrame(workDir, pokemonData)
+        checkMoveAnimation(workDir, moveRecords)
+        checkPlayGame(pokemonData, moveRecords)
+    checkPixels()
+    print("Headless smoke test passed")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
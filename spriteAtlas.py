@@ -0,0 +1,120 @@
+from PIL import Image
+import json
+import math
+import os
+import sys
+
+"""
+    Description: Build step that packs every battle sprite, already resized
+                 to its display size, into one atlas image plus a JSON index
+                 of where each sprite is. The game loads the atlas once and
+                 crops sprites out of it in memory (resizeImageZelle.
+                 SpriteAtlas) instead of resizing and saving a PNG for every
+                 battle.
+
+    Usage: python spriteAtlas.py (the game also rebuilds the atlas on start
+           if it's missing or older than a sprite)
+"""
+
+SPRITE_DIR = "sprites"
+ATLAS_IMAGE = os.path.join(SPRITE_DIR, "atlas.png")
+ATLAS_INDEX = os.path.join(SPRITE_DIR, "atlas.json")
+
+SPRITE_WIDTH = 110
+SPRITE_HEIGHT = 100
+
+
+def spritePath(name, spriteDir=SPRITE_DIR):
+    """
+        Description: Finds a species' original sprite. Sprite files are named
+                     in lower case (arcanine.png for Arcanine).
+        Parameters: name- the species (str),
+                    spriteDir- the sprite folder (str)
+        Return Val: the sprite's path (str)
+    """
+    path = os.path.join(spriteDir, "%s.png" % name)
+    if os.path.exists(path):
+        return path
+    return os.path.join(spriteDir, "%s.png" % name.lower())
+
+
+def buildAtlas(names, width=SPRITE_WIDTH, height=SPRITE_HEIGHT,
+               spriteDir=SPRITE_DIR, imageFile=ATLAS_IMAGE,
+               indexFile=ATLAS_INDEX):
+    """
+        Description: Resizes each species' sprite and packs them in a grid
+        Parameters: names- the species (list of str),
+                    width, height- every sprite's size in the atlas (int),
+                    spriteDir- folder with the original sprites (str),
+                    imageFile- the atlas image to write (str),
+                    indexFile- the atlas index to write (str)
+        Return Val: the index (dict with "size" ([width, height]) and
+                    "sprites" (species name to the [x, y] of its top left
+                    corner))
+    """
+    names = [name for name in names if os.path.exists(spritePath(name,
+                                                                 spriteDir))]
+    columns = max(1, math.ceil(math.sqrt(len(names))))
+    rows = max(1, math.ceil(len(names) / columns))
+    atlas = Image.new("RGBA", (columns * width, rows * height))
+
+    index = {"size": [width, height], "sprites": {}}
+    for i, name in enumerate(names):
+        x = (i % columns) * width
+        y = (i // columns) * height
+        with Image.open(spritePath(name, spriteDir)) as sprite:
+            sprite = sprite.convert("RGBA").resize((width, height),
+                                                   Image.LANCZOS)
+        atlas.paste(sprite, (x, y))
+        index["sprites"][name] = [x, y]
+
+    atlas.save(imageFile)
+    with open(indexFile, "w") as outfile:
+        json.dump(index, outfile, indent=1)
+    return index
+
+
+def readAtlasIndex(names, width=SPRITE_WIDTH, height=SPRITE_HEIGHT,
+                   spriteDir=SPRITE_DIR, imageFile=ATLAS_IMAGE,
+                   indexFile=ATLAS_INDEX):
+    """
+        Description: Reads the atlas index, rebuilding the atlas first if it's
+                     missing, was built for other species or another size, or
+                     is older than one of the sprites
+        Parameters: same as buildAtlas
+        Return Val: the index (dict, see buildAtlas)
+    """
+    try:
+        with open(indexFile) as infile:
+            index = json.load(infile)
+        builtAt = os.path.getmtime(imageFile)
+    except (OSError, ValueError):
+        return buildAtlas(names, width, height, spriteDir, imageFile,
+                          indexFile)
+
+    sources = [spritePath(name, spriteDir) for name in names]
+    upToDate = index["size"] == [width, height] and \
+        set(index["sprites"]) == {name for name, path in zip(names, sources)
+                                  if os.path.exists(path)} and \
+        all(os.path.getmtime(path) <= builtAt for path in sources
+            if os.path.exists(path))
+    if not upToDate:
+        return buildAtlas(names, width, height, spriteDir, imageFile,
+                          indexFile)
+    return index
+
+
+def main():
+    from move import readPokeFile
+
+    filename = sys.argv[1] if len(sys.argv) > 1 else "pokemon-data.csv"
+    names = [pokemon["Name"] for pokemon in readPokeFile(filename)]
+    index = buildAtlas(names)
+    missing = sorted(set(names) - set(index["sprites"]))
+    print("Packed %d sprites into %s" % (len(index["sprites"]), ATLAS_IMAGE))
+    if missing:
+        print("No sprite for:", ", ".join(missing))
+
+
+if __name__ == '__main__':
+    main()
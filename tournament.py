@@ -0,0 +1,261 @@
+from battleEngine import Battle, playBattle, getMoves, PLAYER, COMPUTER
+from dataCache import loadDatasets
+from pokedex import Pokedex
+from multiprocessing import Pool
+import argparse
+import csv
+import json
+import math
+import os
+import random
+import sys
+import time
+
+try:  # drawing every battle's moves in bulk needs numpy
+    from moveSampler import MoveSetSampler
+    from columnar import buildColumns
+    import numpy as np
+except ImportError:
+    MoveSetSampler = None
+
+"""
+    Description: Round robin tournament over every species in
+                 pokemon-data.csv. Each pairing is played many times with
+                 fresh random movesets (as getMoves picks them) and the
+                 pairings are spread across a pool of worker processes.
+                 Each pairing's movesets are drawn in bulk with
+                 moveSampler.MoveSetSampler, over the columnar movepools,
+                 when numpy is installed.
+                 Every pairing gets its own seed, so results are the same no
+                 matter how many workers there are or what order they finish
+                 in.
+
+    Usage: python tournament.py --battles 200 --workers 8 --seed 1
+           [--tier OU to only enter one tier's species]
+"""
+
+_pokemonData = None
+_moveRecords = None
+_sampler = None
+
+
+def loadWorker(filename, moveFilename):
+    """Loads the roster once per worker process"""
+    global _pokemonData, _moveRecords, _sampler
+    _pokemonData, _moveRecords = loadDatasets(filename, moveFilename)
+    if MoveSetSampler is not None:
+        # the movepools as CSR arrays, sampled from without copying
+        _sampler = MoveSetSampler.fromColumns(buildColumns(_pokemonData,
+                                                           _moveRecords))
+
+
+def drawMoveSets(speciesId, battles, rng, npRng):
+    """
+        Description: Draws one species' moveset for each battle of a pairing
+        Parameters: speciesId- the species' ID (int),
+                    battles- number of battles (int),
+                    rng- the pairing's random generator (random.Random),
+                    npRng- the pairing's numpy generator, None without numpy
+        Return Val: a moveset per battle (list of list of MoveRecord)
+    """
+    if npRng is None:
+        return [getMoves(_pokemonData[speciesId], _moveRecords, rng)
+                for i in range(battles)]
+    return [[_moveRecords[moveId] for moveId in row]
+            for row in _sampler.sample(speciesId, battles, npRng).tolist()]
+
+
+def playPairing(task):
+    """
+        Description: Plays one pairing's battles
+        Parameters: task- (first species ID, second species ID, number of
+                    battles, seed) (tuple)
+        Return Val: the pairing's results (dict)
+    """
+    first, second, battles, seed = task
+    rng = random.Random("%s-%s-%s" % (seed, first, second))
+    npRng = None
+    if _sampler is not None:
+        npRng = np.random.default_rng(rng.getrandbits(64))
+    moveSets = {first: drawMoveSets(first, battles, rng, npRng),
+                second: drawMoveSets(second, battles, rng, npRng)}
+    wins = [0, 0]
+    draws = 0
+    for i in range(battles):
+        # alternate sides so neither species keeps the player's Speed tie
+        # advantage
+        if i % 2 == 0:
+            sides = [first, second]
+        else:
+            sides = [second, first]
+        battle = Battle(_pokemonData[sides[PLAYER]],
+                        _pokemonData[sides[COMPUTER]], _moveRecords,
+                        playersMoves=moveSets[sides[PLAYER]][i],
+                        computersMoves=moveSets[sides[COMPUTER]][i], rng=rng)
+        winner = playBattle(battle)
+        if winner is None:
+            draws += 1
+        elif sides[winner] == first:
+            wins[0] += 1
+        else:
+            wins[1] += 1
+    return {"first": first, "second": second, "firstWins": wins[0],
+            "secondWins": wins[1], "draws": draws}
+
+
+def wilsonInterval(wins, games, z=1.96):
+    """
+        Description: Wilson score confidence interval for a win rate
+        Parameters: wins- games won (int),
+                    games- games played (int),
+                    z- normal quantile (1.96 for 95%)
+        Return Val: (low, high) (tuple of float)
+    """
+    if games == 0:
+        return 0.0, 1.0
+    rate = wins / games
+    denominator = 1 + z * z / games
+    center = (rate + z * z / (2 * games)) / denominator
+    spread = z * math.sqrt(rate * (1 - rate) / games +
+                           z * z / (4 * games * games)) / denominator
+    return max(0.0, center - spread), min(1.0, center + spread)
+
+
+def runTournament(pokemonData, filename, moveFilename, battles, workers, seed,
+                  stream=None):
+    """
+        Description: Plays every pairing of species
+        Parameters: pokemonData- the species to enter (list of PokemonRecord
+                    objects),
+                    filename- the roster's file, loaded by each worker (str),
+                    moveFilename- the move data file (str),
+                    battles- battles per pairing (int),
+                    workers- worker processes (int),
+                    seed- base seed (int),
+                    stream- file to write each pairing's result to as a JSON
+                    line as soon as it finishes (file object or None)
+        Return Val: each pairing's results, with species given by ID (list
+                    of dict)
+    """
+    # workers look species up by ID in the full roster they load, so a tier's
+    # species keep the seeds they'd get in a full tournament
+    tasks = []
+    for i, first in enumerate(pokemonData):
+        for second in pokemonData[i + 1:]:
+            tasks.append((first.id, second.id, battles, seed))
+    byId = {pokemon.id: pokemon for pokemon in pokemonData}
+
+    results = []
+    start = time.perf_counter()
+    with Pool(workers, initializer=loadWorker,
+              initargs=(filename, moveFilename)) as pool:
+        for result in pool.imap_unordered(playPairing, tasks):
+            results.append(result)
+            if stream is not None:
+                result = dict(result)
+                result["first"] = byId[result["first"]].name
+                result["second"] = byId[result["second"]].name
+                stream.write(json.dumps(result) + "\n")
+                stream.flush()
+            elapsed = time.perf_counter() - start
+            sys.stderr.write("\r%d/%d pairings, %.0f battles/s" %
+                             (len(results), len(tasks),
+                              len(results) * battles / elapsed))
+    sys.stderr.write("\n")
+    return results
+
+
+def writeResults(pokemonData, results, matrixFile, intervalFile):
+    """
+        Description: Writes the win-rate matrix and each pairing's confidence
+                     interval as CSV files
+        Parameters: pokemonData- the species entered (list of PokemonRecord
+                    objects),
+                    results- from runTournament (list of dict),
+                    matrixFile- file for the matrix, row species' win rate
+                    against column species (str),
+                    intervalFile- file for the per-pairing intervals (str)
+        Return Val: None
+    """
+    names = [pokemon.name for pokemon in pokemonData]
+    # species IDs to rows and columns of the matrix
+    position = {pokemon.id: i for i, pokemon in enumerate(pokemonData)}
+    matrix = [[""] * len(names) for name in names]
+    rows = []
+    for result in results:
+        games = result["firstWins"] + result["secondWins"] + result["draws"]
+        first = position[result["first"]]
+        second = position[result["second"]]
+        for species, opponent, wins in [
+                (first, second, result["firstWins"]),
+                (second, first, result["secondWins"])]:
+            rate = wins / games if games else 0.0
+            low, high = wilsonInterval(wins, games)
+            matrix[species][opponent] = "%.4f" % rate
+            rows.append([names[species], names[opponent], wins,
+                         games - wins - result["draws"], result["draws"],
+                         "%.4f" % rate, "%.4f" % low, "%.4f" % high])
+
+    with open(matrixFile, "w", newline="") as outfile:
+        writer = csv.writer(outfile)
+        writer.writerow(["Name"] + names)
+        for name, row in zip(names, matrix):
+            writer.writerow([name] + row)
+
+    rows.sort()
+    with open(intervalFile, "w", newline="") as outfile:
+        writer = csv.writer(outfile)
+        writer.writerow(["Name", "Opponent", "Wins", "Losses", "Draws",
+                         "Win Rate", "CI Low", "CI High"])
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play every pairing of species and report win rates")
+    parser.add_argument("--data", default="pokemon-data.csv",
+                        help="roster file (default: pokemon-data.csv)")
+    parser.add_argument("--moves", default="move-data.csv",
+                        help="move data file (default: move-data.csv)")
+    parser.add_argument("--battles", type=int, default=100,
+                        help="battles per pairing (default: 100)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="worker processes (default: one per core)")
+    parser.add_argument("--tier", default=None,
+                        help="only enter species from this tier, e.g. OU "
+                             "(default: every species)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="base random seed (default: 0)")
+    parser.add_argument("--matrix", default="win-rates.csv",
+                        help="win-rate matrix output (default: win-rates.csv)")
+    parser.add_argument("--intervals", default="win-rate-intervals.csv",
+                        help="per-pairing 95%% confidence intervals output "
+                             "(default: win-rate-intervals.csv)")
+    parser.add_argument("--stream", default=None,
+                        help="also write each pairing's result to this file "
+                             "as a JSON line as soon as it's done "
+                             "('-' for stdout)")
+    args = parser.parse_args()
+
+    # loads (and if needed refreshes) the snapshot before the workers start,
+    # so they all read it instead of parsing the CSV files themselves
+    pokemonData = loadDatasets(args.data, args.moves)[0]
+    if args.tier is not None:
+        pokemonData = list(Pokedex(pokemonData).inTier(args.tier))
+        if len(pokemonData) < 2:
+            parser.error("fewer than two species in tier %s" % args.tier)
+    stream = None
+    if args.stream == "-":
+        stream = sys.stdout
+    elif args.stream:
+        stream = open(args.stream, "w")
+
+    results = runTournament(pokemonData, args.data, args.moves, args.battles,
+                            args.workers, args.seed, stream)
+    if stream is not None and stream is not sys.stdout:
+        stream.close()
+    writeResults(pokemonData, results, args.matrix, args.intervals)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+import threading
+import time
+
+"""
+    Description: Helpers for running a turn without blocking the Tk event
+                 loop. Slow work (damage calculations, API requests) runs on
+                 a background thread, and drawing is split into small steps
+                 and tweens that a FrameScheduler plays on a clock driven by
+                 after() instead of sleep(), so the window keeps repainting
+                 and responding between them and animations take the same
+                 time on any machine.
+"""
+
+FRAME_MS = 16  # roughly one frame at 60 FPS
+
+
+def runInBackground(widget, work, onDone, onError=None,
+                    pollMs=FRAME_MS):
+    """
+        Description: Runs work() on a background thread and calls
+                     onDone(result) back on the Tk thread when it's finished
+        Parameters: widget- the window to wait in, used for after() (GraphWin
+                    object),
+                    work- function to run, takes no parameters,
+                    onDone- function called with work's return value,
+                    onError- function called with the exception if work
+                    raises one; without it the exception is raised in the Tk
+                    callback,
+                    pollMs- how often to check if work is done (int)
+        Return Val: None
+
+        If the window is closed before work finishes, neither callback is
+        called.
+    """
+    result = {}
+
+    def runWork():
+        try:
+            result["value"] = work()
+        except Exception as error:
+            result["error"] = error
+
+    thread = threading.Thread(target=runWork, daemon=True)
+    thread.start()
+
+    def poll():
+        if widget.isClosed():
+            # nothing left to report to
+            return
+        if thread.is_alive():
+            widget.after(pollMs, poll)
+        elif "error" in result:
+            if onError is None:
+                raise result["error"]
+            onError(result["error"])
+        else:
+            onDone(result["value"])
+
+    widget.after(pollMs, poll)
+
+
+INSTANT = float("inf")  # speed multiplier that skips every delay and tween
+
+
+class Tween:
+
+    """A step that changes something gradually: update(progress) is called
+    once per frame with progress going from 0 to 1 over duration seconds"""
+
+    __slots__ = ("duration", "update")
+
+    def __init__(self, duration, update):
+        self.duration = duration
+        self.update = update
+
+
+class Timeline:
+
+    """Plays a generator of steps. Each step is either a number of seconds to
+    wait or a Tween to play; steps are timed from when the one before should
+    have ended, not from when it was noticed, so lateness doesn't add up."""
+
+    def __init__(self, steps, onDone=None):
+        self.steps = steps
+        self.onDone = onDone
+        self.current = None
+        self.start = None  # when the current step started, scheduler time
+        self.done = False
+
+    def advance(self, now, speed):
+        """
+            Description: Plays as far as the clock has got. If a frame came
+                         late, a tween jumps straight to where it should be
+                         and finished steps are skipped past (frame dropping).
+            Parameters: now- the scheduler's clock (float, seconds),
+                        speed- speed multiplier (float, INSTANT to skip)
+            Return Val: None
+        """
+        if self.start is None:
+            self.start = now
+        while not self.done:
+            if self.current is None:
+                try:
+                    self.current = next(self.steps)
+                except StopIteration:
+                    self.done = True
+                    if self.onDone is not None:
+                        self.onDone()
+                    return
+
+            if isinstance(self.current, Tween):
+                length = self.current.duration / speed
+                progress = 1.0 if length <= 0 else \
+                    min(1.0, (now - self.start) / length)
+                self.current.update(progress)
+            else:
+                length = (self.current or 0) / speed
+                progress = 1.0 if now - self.start >= length else 0.0
+
+            if progress < 1.0:
+                return
+            self.start += length
+            self.current = None
+
+
+class FrameScheduler:
+
+    """Runs Timelines on one clock driven by Tk's after(), at a target frame
+    rate. Every active timeline is advanced once per frame, inside one
+    GraphWin.batch() so the frame costs a single update, and only while
+    there's something to play."""
+
+    def __init__(self, widget, fps=1000 / FRAME_MS, speed=1.0):
+        """
+            Parameters: widget- the window being drawn in (GraphWin object),
+                        fps- target frames per second (float),
+                        speed- speed multiplier for every delay and tween,
+                        e.g. 2 for twice as fast or INSTANT (float)
+        """
+        self.widget = widget
+        self.frameMs = max(1, int(round(1000 / fps)))
+        self.speed = speed
+        self.timelines = []
+        self.ticking = False
+
+    def play(self, steps, onDone=None):
+        """
+            Description: Starts playing a generator of steps. Each step draws
+                         something and yields how long to wait (in seconds)
+                         or a Tween to play before the next one.
+            Parameters: steps- the drawing steps (generator),
+                        onDone- function called with no parameters once every
+                        step has run
+            Return Val: the timeline (Timeline object)
+        """
+        timeline = Timeline(steps, onDone)
+        if self.widget.isClosed():
+            return timeline
+        # the first step is drawn right away rather than a frame later
+        with self.widget.batch():
+            timeline.advance(time.perf_counter(), self.speed)
+        if not timeline.done:
+            self.timelines.append(timeline)
+            self._schedule()
+        return timeline
+
+    def _schedule(self):
+        if not self.ticking:
+            self.ticking = True
+            self.widget.after(self.frameMs, self._tick)
+
+    def _tick(self):
+        self.ticking = False
+        if self.widget.isClosed():
+            # window closed mid-turn, nothing left to draw into
+            self.timelines = []
+            return
+        now = time.perf_counter()
+        # everything drawn this frame is shown with one window update
+        with self.widget.batch():
+            for timeline in list(self.timelines):
+                timeline.advance(now, self.speed)
+        self.timelines = [x for x in self.timelines if not x.done]
+        if self.timelines:
+            self._schedule()
+
+
+class StallMonitor:
+
+    """Measures how late Tk's event loop services a repeating timer, i.e. the
+    longest time the window went without handling events"""
+
+    def __init__(self, widget, intervalMs=FRAME_MS):
+        self.widget = widget
+        self.interval = intervalMs / 1000
+        self.running = False
+        self.longestStall = 0
+        self.lastTick = None
+
+    def start(self):
+        self.running = True
+        self.longestStall = 0
+        self.lastTick = time.perf_counter()
+        self.widget.after(int(self.interval * 1000), self._tick)
+
+    def _tick(self):
+        if not self.running or self.widget.isClosed():
+            return
+        now = time.perf_counter()
+        stall = now - self.lastTick - self.interval
+        self.longestStall = max(self.longestStall, stall)
+        self.lastTick = now
+        self.widget.after(int(self.interval * 1000), self._tick)
+
+    def stop(self):
+        """
+            Description: Stops measuring
+            Parameters: None
+            Return Val: the longest stall seen, in seconds (float)
+        """
+        self.running = False
+        if self.lastTick is not None:
+            # a stall still in progress when stopped counts too
+            stall = time.perf_counter() - self.lastTick - self.interval
+            self.longestStall = max(self.longestStall, stall)
+        return self.longestStall
@@ -0,0 +1,98 @@
+"""
+    Description: Type IDs and the type effectiveness table. Each type name is
+                 turned into a small integer once, when the data files are
+                 loaded, and TYPE_CHART is compiled into a flat 18x18 list so
+                 that effectiveness is a list index (and a multiply for dual
+                 types) rather than string comparisons.
+
+    Type chart: https://bulbapedia.bulbagarden.net/wiki/Type/Type_chart
+"""
+
+# attacking type -> {defending type: multiplier}; pairs not listed are 1x
+TYPE_CHART = {
+    "Normal": {"Rock": 0.5, "Ghost": 0, "Steel": 0.5},
+    "Fire": {"Fire": 0.5, "Water": 0.5, "Grass": 2, "Ice": 2, "Bug": 2,
+             "Rock": 0.5, "Dragon": 0.5, "Steel": 2},
+    "Water": {"Fire": 2, "Water": 0.5, "Grass": 0.5, "Ground": 2, "Rock": 2,
+              "Dragon": 0.5},
+    "Electric": {"Water": 2, "Electric": 0.5, "Grass": 0.5, "Ground": 0,
+                 "Flying": 2, "Dragon": 0.5},
+    "Grass": {"Fire": 0.5, "Water": 2, "Grass": 0.5, "Poison": 0.5,
+              "Ground": 2, "Flying": 0.5, "Bug": 0.5, "Rock": 2,
+              "Dragon": 0.5, "Steel": 0.5},
+    "Ice": {"Fire": 0.5, "Water": 0.5, "Grass": 2, "Ice": 0.5, "Ground": 2,
+            "Flying": 2, "Dragon": 2, "Steel": 0.5},
+    "Fighting": {"Normal": 2, "Ice": 2, "Poison": 0.5, "Flying": 0.5,
+                 "Psychic": 0.5, "Bug": 0.5, "Rock": 2, "Ghost": 0,
+                 "Dark": 2, "Steel": 2, "Fairy": 0.5},
+    "Poison": {"Grass": 2, "Poison": 0.5, "Ground": 0.5, "Rock": 0.5,
+               "Ghost": 0.5, "Steel": 0, "Fairy": 2},
+    "Ground": {"Fire": 2, "Electric": 2, "Grass": 0.5, "Poison": 2,
+               "Flying": 0, "Bug": 0.5, "Rock": 2, "Steel": 2},
+    "Flying": {"Electric": 0.5, "Grass": 2, "Fighting": 2, "Bug": 2,
+               "Rock": 0.5, "Steel": 0.5},
+    "Psychic": {"Fighting": 2, "Poison": 2, "Psychic": 0.5, "Dark": 0,
+                "Steel": 0.5},
+    "Bug": {"Fire": 0.5, "Grass": 2, "Fighting": 0.5, "Poison": 0.5,
+            "Flying": 0.5, "Psychic": 2, "Ghost": 0.5, "Dark": 2,
+            "Steel": 0.5, "Fairy": 0.5},
+    "Rock": {"Fire": 2, "Ice": 2, "Fighting": 0.5, "Ground": 0.5,
+             "Flying": 2, "Bug": 2, "Steel": 0.5},
+    "Ghost": {"Normal": 0, "Psychic": 2, "Ghost": 2, "Dark": 0.5},
+    "Dragon": {"Dragon": 2, "Steel": 0.5, "Fairy": 0},
+    "Dark": {"Fighting": 0.5, "Psychic": 2, "Ghost": 2, "Dark": 0.5,
+             "Fairy": 0.5},
+    "Steel": {"Fire": 0.5, "Water": 0.5, "Electric": 0.5, "Ice": 2,
+              "Rock": 2, "Steel": 0.5, "Fairy": 2},
+    "Fairy": {"Fire": 0.5, "Fighting": 2, "Poison": 0.5, "Dragon": 2,
+              "Dark": 2, "Steel": 0.5},
+}
+
+
+TYPE_NAMES = list(TYPE_CHART)
+TYPE_IDS = {}
+for typeName in TYPE_NAMES:
+    TYPE_IDS[typeName] = len(TYPE_IDS)
+TYPE_COUNT = len(TYPE_NAMES)
+
+
+def typeId(typeName):
+    """
+        Description: Gets the ID of a type
+        Parameters: typeName- the type's name, e.g. 'Fire' (str)
+        Return Val: the type's ID (int)
+    """
+    return TYPE_IDS[typeName]
+
+
+def compileTypeChart():
+    """
+        Description: Compiles TYPE_CHART into a flat list indexed by
+                     attacking type ID * TYPE_COUNT + defending type ID
+        Parameters: None
+        Return Val: the multipliers (list of float)
+    """
+    table = [1.0] * (TYPE_COUNT * TYPE_COUNT)
+    for attackingType, matchups in TYPE_CHART.items():
+        for defendingType, multiplier in matchups.items():
+            table[TYPE_IDS[attackingType] * TYPE_COUNT +
+                  TYPE_IDS[defendingType]] = float(multiplier)
+    return table
+
+
+EFFECTIVENESS = compileTypeChart()
+
+
+def effectiveness(moveTypeId, defendingTypeIds):
+    """
+        Description: Gets the type effectiveness multiplier of a move
+        Parameters: moveTypeId- the move's type ID (int),
+                    defendingTypeIds- the defending Pokemon's type IDs (tuple
+                    of one or two ints)
+        Return Val: the multiplier (0, 0.25, 0.5, 1, 2 or 4)
+    """
+    row = moveTypeId * TYPE_COUNT
+    if len(defendingTypeIds) == 1:
+        return EFFECTIVENESS[row + defendingTypeIds[0]]
+    return (EFFECTIVENESS[row + defendingTypeIds[0]] *
+            EFFECTIVENESS[row + defendingTypeIds[1]])